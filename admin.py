@@ -10,6 +10,10 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import pathlib
 
+from messageindex import MessageIndexStore
+from ratelimit import KeyedRateLimiter
+from termmatcher import TermMatcher
+
 class AdminCog(commands.Cog):
     def __init__(self, client):
         self.client = client
@@ -19,11 +23,10 @@ class AdminCog(commands.Cog):
         self.data_dir = pathlib.Path("data")
         self.data_dir.mkdir(exist_ok=True)
         
-        # Cache file paths
-        self.message_cache_file = self.data_dir / "message_cache.json"
-        self.message_index_file = self.data_dir / "message_index.json"
-        self.last_scan_file = self.data_dir / "last_scan.txt"
-        self.word_index = defaultdict(list)  # In-memory index for faster searching
+        # Live word index of messages for cclear, one per guild
+        self.message_index = MessageIndexStore(str(self.data_dir / "message_index"))
+        self.backfill_workers = 4  # Channels scanned at the same time
+        self.backfill_flush_size = 5000  # Journal entries buffered during a scan
         
         # Role saver file paths
         self.roles_file = self.data_dir / "saved_roles.json"
@@ -57,6 +60,12 @@ class AdminCog(commands.Cog):
         
         # Initialize auto reactions
         self.auto_reactions = self.load_auto_reactions()
+        self.reaction_triggers = {}  # guild_id -> (TermMatcher, [emoji, ...])
+        for guild_id in self.auto_reactions:
+            self.refresh_reaction_triggers(guild_id)
+        # Space out reactions per channel so trigger bursts don't hit 429s
+        self.reaction_limiter = KeyedRateLimiter(interval=0.3, max_pending=10)
+        self.reaction_tasks = set()
         
         # Initialize reaction roles
         self.reaction_roles = self.load_reaction_roles()
@@ -68,6 +77,8 @@ class AdminCog(commands.Cog):
         self.user_actions = self.load_user_actions()
 
     def cog_unload(self):
+        self.client.pipeline.unregister("auto_reactions")
+        self.message_index.stop()
         # Cancel the role save task when the cog is unloaded
         if self.role_save_task:
             self.role_save_task.cancel()
@@ -75,6 +86,12 @@ class AdminCog(commands.Cog):
     async def cog_load(self):
         # Start the role save task when the cog is loaded
         self.role_save_task = self.client.loop.create_task(self.role_save_loop())
+        self.client.pipeline.register("auto_reactions", self.auto_reaction_stage, order=40)
+        self.message_index.start()
+
+    async def flush_pending(self):
+        # Called by the bot on shutdown
+        await self.message_index.flush()
 
     # Load user actions from file
     def load_user_actions(self):
@@ -917,11 +934,12 @@ class AdminCog(commands.Cog):
         muted_role = await self.get_or_create_muted_role(ctx)
         if muted_role in member.roles:
             raise commands.CommandError(f"{member.mention} is already muted.")
+        duration_seconds = self.parse_mute_duration(duration)
         
         # Add to user actions
         await self.add_user_action(ctx.guild.id, member.id, "mute", reason, duration)
         
-        await self.apply_mute(ctx, member, muted_role, duration, reason)
+        await self.apply_mute(ctx, member, muted_role, duration, duration_seconds, reason)
 
     async def get_or_create_muted_role(self, ctx):
         muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
@@ -931,7 +949,7 @@ class AdminCog(commands.Cog):
                 await channel.set_permissions(muted_role, speak=False, send_messages=False)
         return muted_role
 
-    async def apply_mute(self, ctx, member, muted_role, duration, reason):
+    async def apply_mute(self, ctx, member, muted_role, duration, duration_seconds, reason):
         await member.add_roles(muted_role)
         embed = discord.Embed(
             title="Mute",
@@ -940,38 +958,34 @@ class AdminCog(commands.Cog):
         )
         await ctx.send(embed=embed)
         
-        asyncio.create_task(self.schedule_unmute(ctx, member, muted_role, duration))
+        await self.schedule_unmute(ctx, member, muted_role, duration_seconds)
 
-    async def schedule_unmute(self, ctx, member, muted_role, duration):
+    def parse_mute_duration(self, duration):
         if duration.endswith('s'):
-            duration_seconds = int(duration[:-1])
+            return int(duration[:-1])
         elif duration.endswith('m'):
-            duration_seconds = int(duration[:-1]) * 60
+            return int(duration[:-1]) * 60
         elif duration.endswith('h'):
-            duration_seconds = int(duration[:-1]) * 3600
+            return int(duration[:-1]) * 3600
         elif duration.endswith('d'):
-            duration_seconds = int(duration[:-1]) * 86400
-        else:
-            try:
-                duration_seconds = int(duration) * 60
-            except ValueError:
-                raise commands.CommandError(f"Invalid duration format: {duration}. Use formats like '30s', '10m', '1h', or '1d'.")
-        
-        await asyncio.sleep(duration_seconds)
-        
+            return int(duration[:-1]) * 86400
         try:
-            member = await ctx.guild.fetch_member(member.id)
-        except discord.NotFound:
-            return  # Member left the server, no need to unmute
-            
-        if muted_role in member.roles:
-            await member.remove_roles(muted_role)
-            unmute_embed = discord.Embed(
-                title="Unmute",
-                description=f"{member.mention} has been automatically unmuted.",
-                color=discord.Color.green()
-            )
-            await ctx.send(embed=unmute_embed)
+            return int(duration) * 60
+        except ValueError:
+            raise commands.CommandError(f"Invalid duration format: {duration}. Use formats like '30s', '10m', '1h', or '1d'.")
+
+    async def schedule_unmute(self, ctx, member, muted_role, duration_seconds):
+        # Persistent timer, the unmute also happens after a restart
+        await self.client.mod_timers.schedule(
+            "remove_role", ctx.guild.id, member.id, duration_seconds,
+            role_id=muted_role.id,
+            channel_id=ctx.channel.id,
+            notice={
+                "title": "Unmute",
+                "description": f"{member.mention} has been automatically unmuted.",
+                "color": discord.Color.green().value,
+            },
+        )
             
     @commands.command()
     @has_permissions(administrator=True)
@@ -979,6 +993,7 @@ class AdminCog(commands.Cog):
         muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
         if muted_role and muted_role in member.roles:
             await member.remove_roles(muted_role)
+            await self.client.mod_timers.cancel(ctx.guild.id, member.id, role_id=muted_role.id)
             embed = discord.Embed(
                 title="Unmute",
                 description=f"{member.mention} has been unmuted.",
@@ -1060,21 +1075,19 @@ class AdminCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # If not permanent, schedule role removal
-            if duration_seconds is not None:
-                await asyncio.sleep(duration_seconds)
-                try:
-                    member = await ctx.guild.fetch_member(member.id)
-                    if role in member.roles:  # Check if user still has the role
-                        await member.remove_roles(role)
-                        embed = discord.Embed(
-                            title="Role Expired",
-                            description=f"Removed {role.mention} from {member.mention} (Duration expired).",
-                            color=discord.Color.blue()
-                        )
-                        await ctx.send(embed=embed)
-                except discord.NotFound:
-                    # Member left the server
-                    pass
+            if duration_seconds is None:
+                await self.client.mod_timers.cancel(ctx.guild.id, member.id, role_id=role.id)
+            else:
+                await self.client.mod_timers.schedule(
+                    "remove_role", ctx.guild.id, member.id, duration_seconds,
+                    role_id=role.id,
+                    channel_id=ctx.channel.id,
+                    notice={
+                        "title": "Role Expired",
+                        "description": f"Removed {role.mention} from {member.mention} (Duration expired).",
+                        "color": discord.Color.blue().value,
+                    },
+                )
                     
         except discord.Forbidden:
             raise commands.CommandError("I don't have permission to manage roles.")
@@ -1093,6 +1106,7 @@ class AdminCog(commands.Cog):
             # If no time specified, remove permanently
             if not time:
                 await member.remove_roles(role)
+                await self.client.mod_timers.cancel(ctx.guild.id, member.id, role_id=role.id)
                 embed = discord.Embed(
                     title="Role Removed",
                     description=f"Removed {role.mention} from {member.mention} permanently.",
@@ -1129,20 +1143,16 @@ class AdminCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Schedule role restoration
-            await asyncio.sleep(duration_seconds)
-            try:
-                member = await ctx.guild.fetch_member(member.id)
-                if not role in member.roles:  # Only add if they don't already have it
-                    await member.add_roles(role)
-                    embed = discord.Embed(
-                        title="Role Restored",
-                        description=f"Restored {role.mention} to {member.mention} (Temporary removal period ended).",
-                        color=discord.Color.green()
-                    )
-                    await ctx.send(embed=embed)
-            except discord.NotFound:
-                # Member left the server
-                pass
+            await self.client.mod_timers.schedule(
+                "add_role", ctx.guild.id, member.id, duration_seconds,
+                role_id=role.id,
+                channel_id=ctx.channel.id,
+                notice={
+                    "title": "Role Restored",
+                    "description": f"Restored {role.mention} to {member.mention} (Temporary removal period ended).",
+                    "color": discord.Color.green().value,
+                },
+            )
                     
         except discord.Forbidden:
             raise commands.CommandError("I don't have permission to manage roles.")
@@ -1226,21 +1236,19 @@ class AdminCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # If not permanent, schedule role removal
-            if duration_seconds is not None:
-                await asyncio.sleep(duration_seconds)
-                try:
-                    member = await ctx.guild.fetch_member(member.id)
-                    if role in member.roles:  # Check if user still has the role
-                        await member.remove_roles(role)
-                        embed = discord.Embed(
-                            title="Jail Time Ended",
-                            description=f"Released {member.mention} from jail (Time served).",
-                            color=discord.Color.green()
-                        )
-                        await ctx.send(embed=embed)
-                except discord.NotFound:
-                    # Member left the server
-                    pass
+            if duration_seconds is None:
+                await self.client.mod_timers.cancel(ctx.guild.id, member.id, role_id=role.id)
+            else:
+                await self.client.mod_timers.schedule(
+                    "remove_role", ctx.guild.id, member.id, duration_seconds,
+                    role_id=role.id,
+                    channel_id=ctx.channel.id,
+                    notice={
+                        "title": "Jail Time Ended",
+                        "description": f"Released {member.mention} from jail (Time served).",
+                        "color": discord.Color.green().value,
+                    },
+                )
                     
         except discord.Forbidden:
             raise commands.CommandError("I don't have permission to manage roles.")
@@ -1285,6 +1293,7 @@ class AdminCog(commands.Cog):
             if emoji in self.auto_reactions.get(guild_id, {}):
                 del self.auto_reactions[guild_id][emoji]
                 self.save_auto_reactions()
+                self.refresh_reaction_triggers(guild_id)
                 await ctx.send(f"Removed auto reaction for term: `{emoji}`")
             else:
                 await ctx.send(f"No auto reaction found for term: `{emoji}`")
@@ -1318,6 +1327,7 @@ class AdminCog(commands.Cog):
             # Add the reaction to our dictionary
             self.auto_reactions[guild_id][term] = emoji
             self.save_auto_reactions()
+            self.refresh_reaction_triggers(guild_id)
             
             await ctx.send(f"Added auto reaction: When someone mentions `{term}`, I'll react with {emoji}")
             
@@ -1343,6 +1353,7 @@ class AdminCog(commands.Cog):
             emoji = self.auto_reactions[guild_id][term]
             del self.auto_reactions[guild_id][term]
             self.save_auto_reactions()
+            self.refresh_reaction_triggers(guild_id)
             await ctx.send(f"Removed auto reaction: `{term}` → {emoji}")
         else:
             await ctx.send(f"No auto reaction found for term: `{term}`")
@@ -1361,6 +1372,7 @@ class AdminCog(commands.Cog):
             # If no time specified, remove permanently
             if not time:
                 await member.remove_roles(role)
+                await self.client.mod_timers.cancel(ctx.guild.id, member.id, role_id=role.id)
                 embed = discord.Embed(
                     title="User Released",
                     description=f"Released {member.mention} from jail permanently.",
@@ -1397,20 +1409,16 @@ class AdminCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Schedule return to jail
-            await asyncio.sleep(duration_seconds)
-            try:
-                member = await ctx.guild.fetch_member(member.id)
-                if not role in member.roles:  # Only add if they don't already have it
-                    await member.add_roles(role)
-                    embed = discord.Embed(
-                        title="Return to Jail",
-                        description=f"Returned {member.mention} to jail (Temporary release period ended).",
-                        color=discord.Color.red()
-                    )
-                    await ctx.send(embed=embed)
-            except discord.NotFound:
-                # Member left the server
-                pass
+            await self.client.mod_timers.schedule(
+                "add_role", ctx.guild.id, member.id, duration_seconds,
+                role_id=role.id,
+                channel_id=ctx.channel.id,
+                notice={
+                    "title": "Return to Jail",
+                    "description": f"Returned {member.mention} to jail (Temporary release period ended).",
+                    "color": discord.Color.red().value,
+                },
+            )
                     
         except discord.Forbidden:
             raise commands.CommandError("I don't have permission to manage roles.")
@@ -1421,22 +1429,26 @@ class AdminCog(commands.Cog):
         if not args:
             raise commands.CommandError("Please provide search text or yes/no for confirmation.")
 
-        # Handle scan command
-        if args[0] == '-scan':
-            return await self.scan_all_messages(ctx)
-
         # Handle confirmation responses
         if args[0].lower() in ['yes', 'no']:
             return await self.handle_cclear_confirmation(ctx, args[0].lower())
 
-        # Check if we have a recent cache
-        if not self.is_cache_recent():
-            await ctx.send(embed=discord.Embed(
-                title="Cache Not Found or Outdated",
-                description="Message cache is outdated or doesn't exist. Please run `cclear -scan` first.",
-                color=discord.Color.red()
-            ))
-            return
+        index = await self.message_index.get(ctx.guild.id)
+
+        # Handle scan commands: -scan resumes an interrupted scan, or else
+        # rebuilds the index from the full history, -rebuild always rebuilds
+        if args[0] == '-scan':
+            resume = not index.backfilled and bool(index.checkpoints)
+            return await self.scan_all_messages(ctx, index, rebuild=not resume)
+        if args[0] == '-rebuild':
+            return await self.scan_all_messages(ctx, index, rebuild=True)
+
+        # The index is kept current by message events, it only has to be
+        # backfilled from history once
+        if not index.backfilled:
+            await self.scan_all_messages(ctx, index)
+            if not index.backfilled:
+                return
 
         # Parse arguments
         target_user = None
@@ -1502,164 +1514,177 @@ class AdminCog(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-    async def scan_all_messages(self, ctx):
-        status_msg = await ctx.send(embed=discord.Embed(
-            title="Scanning Messages",
-            description="Starting scan... This might take a while.",
-            color=discord.Color.blue()
-        ))
+    async def scan_all_messages(self, ctx, index, rebuild=False):
+        if index.backfill_lock.locked():
+            raise commands.CommandError("The message index is already being built, please wait for it to finish.")
 
-        cached_messages = []
-        channels_to_scan = ctx.guild.text_channels
-        total_channels = len(channels_to_scan)
-        processed_channels = 0
-        total_messages = 0
+        async with index.backfill_lock:
+            if rebuild:
+                index.reset()
 
-        # Clear existing index
-        self.word_index.clear()
+            # Channels finished by an earlier, interrupted scan are skipped
+            channels_to_scan = [channel for channel in ctx.guild.text_channels
+                                if not index.checkpoints.get(channel.id, [None, False])[1]]
+            resumed = sum(1 for channel in channels_to_scan if channel.id in index.checkpoints)
+            progress = {'channels': 0, 'messages': 0, 'skipped': [], 'failed': [],
+                        'total_channels': len(channels_to_scan), 'resumed': resumed}
 
-        for channel in channels_to_scan:
-            try:
-                processed_channels += 1
-                await status_msg.edit(embed=discord.Embed(
-                    title="Scanning Messages",
-                    description=f"Channel {processed_channels}/{total_channels}: {channel.name}\n"
-                              f"Total messages scanned: {total_messages}",
-                    color=discord.Color.blue()
-                ))
+            status_msg = await ctx.send(embed=self.scan_progress_embed(progress))
 
-                async for message in channel.history(limit=None):
-                    total_messages += 1
-                    
-                    # Update progress every 100 messages
-                    if total_messages % 100 == 0:
-                        await status_msg.edit(embed=discord.Embed(
-                            title="Scanning Messages",
-                            description=f"Channel {processed_channels}/{total_channels}: {channel.name}\n"
-                                      f"Total messages scanned: {total_messages}",
-                            color=discord.Color.blue()
-                        ))
+            queue = asyncio.Queue()
+            for channel in channels_to_scan:
+                queue.put_nowait(channel)
 
-                    # Cache message data
-                    message_data = {
-                        'content': message.content,
-                        'channel_id': channel.id,
-                        'message_id': message.id,
-                        'author_id': message.author.id,
-                        'timestamp': message.created_at.isoformat()
-                    }
-                    
-                    # Add to cached messages
-                    msg_index = len(cached_messages)
-                    cached_messages.append(message_data)
-                    
-                    # Index words for faster searching
-                    words = set(message.content.lower().split())  # Using set to avoid duplicate words
-                    for word in words:
-                        self.word_index[word].append(msg_index)
-
-            except discord.Forbidden:
+            # Live events keep updating the index while history is scanned
+            index.begin_backfill()
+            reporter = asyncio.create_task(self.report_scan_progress(status_msg, progress))
+            complete = False
+            try:
+                # Each channel has its own history rate limit bucket, a few
+                # workers scan channels side by side
+                workers = min(self.backfill_workers, len(channels_to_scan))
+                await asyncio.gather(*(self.backfill_worker(queue, index, progress) for _ in range(workers)))
+                complete = not progress['failed']
+            finally:
+                reporter.cancel()
+                index.end_backfill(complete)
+                await index.flush(compact=complete)
+
+            if progress['failed']:
                 await status_msg.edit(embed=discord.Embed(
-                    title="Scanning Messages",
-                    description=f"Skipped channel {channel.name} (No access)\n"
-                              f"Total messages scanned: {total_messages}",
-                    color=discord.Color.blue()
+                    title="Scan Incomplete",
+                    description=f"Indexed {progress['messages']} messages, but {len(progress['failed'])} channels failed: "
+                              f"{', '.join(progress['failed'][:10])}\n"
+                              f"Search again or run `cclear -scan` to resume where the scan stopped.",
+                    color=discord.Color.orange()
                 ))
-                continue
-            except Exception as e:
-                await ctx.send(f"Error in channel {channel.name}: {str(e)}")
-                continue
-
-        # Save to cache files
-        try:
-            # Save messages
-            with open(self.message_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cached_messages, f, ensure_ascii=False, indent=2)
-            
-            # Save word index
-            with open(self.message_index_file, 'w', encoding='utf-8') as f:
-                json.dump(dict(self.word_index), f, ensure_ascii=False, indent=2)
-            
-            # Save scan timestamp
-            with open(self.last_scan_file, 'w') as f:
-                f.write(datetime.utcnow().isoformat())
+                return
 
+            skipped = f"\nSkipped {len(progress['skipped'])} channels without access." if progress['skipped'] else ""
             await status_msg.edit(embed=discord.Embed(
                 title="Scan Complete",
-                description=f"Successfully cached {total_messages} messages from {total_channels} channels.\n"
-                          f"Created search index with {len(self.word_index)} unique words.",
+                description=f"Indexed {progress['messages']} messages from {progress['channels']} channels.{skipped}\n"
+                          f"The index now holds {len(index)} messages and is kept up to date automatically.",
                 color=discord.Color.green()
             ))
-        except Exception as e:
-            await ctx.send(f"Error saving cache: {str(e)}")
 
-    def load_cache(self):
-        try:
-            # Load messages
-            with open(self.message_cache_file, 'r', encoding='utf-8') as f:
-                cached_messages = json.load(f)
-            
-            # Load word index
-            with open(self.message_index_file, 'r', encoding='utf-8') as f:
-                self.word_index = defaultdict(list, json.load(f))
-            
-            return cached_messages
-        except:
-            raise commands.CommandError("Error reading cache files. Please run `cclear -scan` again.")
+    async def backfill_worker(self, queue, index, progress):
+        while not queue.empty():
+            channel = queue.get_nowait()
+            try:
+                await self.backfill_channel(channel, index, progress)
+            except discord.Forbidden:
+                index.checkpoint(channel.id, None, done=True)
+                progress['skipped'].append(channel.name)
+            except Exception as e:
+                # The checkpoint keeps what was scanned, a later scan resumes here
+                print(f"Error scanning channel {channel.name}: {e}")
+                progress['failed'].append(channel.name)
+            progress['channels'] += 1
+
+    async def backfill_channel(self, channel, index, progress):
+        before_id, _ = index.checkpoints.get(channel.id, [None, False])
+        before = discord.Object(id=before_id) if before_id else None
+        scanned = 0
+        async for message in channel.history(limit=None, before=before):
+            index.add_backfilled(
+                message.id, channel.id, message.author.id,
+                int(message.created_at.timestamp()), message.content
+            )
+            progress['messages'] += 1
+            scanned += 1
+            # One history page, checkpoint it and write big batches right away
+            if scanned % 100 == 0:
+                index.checkpoint(channel.id, message.id)
+                if len(index.pending) >= self.backfill_flush_size:
+                    await index.flush()
+        index.checkpoint(channel.id, None, done=True)
+
+    def scan_progress_embed(self, progress):
+        resumed = f" (resuming {progress['resumed']})" if progress['resumed'] else ""
+        return discord.Embed(
+            title="Scanning Messages",
+            description=f"Channels: {progress['channels']}/{progress['total_channels']}{resumed}\n"
+                      f"Total messages scanned: {progress['messages']}",
+            color=discord.Color.blue()
+        )
+
+    async def report_scan_progress(self, status_msg, progress):
+        # Progress on a timer, so fast scans don't spend requests on embed edits
+        while True:
+            await asyncio.sleep(5)
+            try:
+                await status_msg.edit(embed=self.scan_progress_embed(progress))
+            except discord.HTTPException:
+                pass
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # Not a pipeline stage: the pipeline skips bots and webhooks, but the
+        # backfill indexes every author, and live indexing has to match it
+        if not message.guild:
+            return
+        index = await self.message_index.tracked_index(message.guild.id)
+        if index is not None:
+            index.add(message.id, message.channel.id, message.author.id,
+                      int(message.created_at.timestamp()), message.content)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+        # Raw events also cover messages that are only known from the backfill
+        content = payload.data.get('content')
+        if content is None:
+            return  # Embed-only update
+        index = await self.message_index.tracked_index(payload.guild_id)
+        if index is not None:
+            index.edit(payload.message_id, content)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        index = await self.message_index.tracked_index(payload.guild_id)
+        if index is not None:
+            index.delete(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload):
+        index = await self.message_index.tracked_index(payload.guild_id)
+        if index is not None:
+            for message_id in payload.message_ids:
+                index.delete(message_id)
 
     async def search_cached_messages(self, ctx, search_text, current_channel_only, target_user):
         status_msg = await ctx.send(embed=discord.Embed(
             title="Searching Messages",
-            description="Reading cache files...",
+            description="Searching the message index...",
             color=discord.Color.blue()
         ))
 
-        try:
-            cached_messages = self.load_cache()
-        except Exception as e:
-            await status_msg.delete()
-            raise e
+        index = await self.message_index.get(ctx.guild.id)
+        matches = index.search(
+            search_text,
+            channel_id=ctx.channel.id if current_channel_only else None,
+            author_id=target_user.id if target_user else None,
+        )
 
-        messages_to_delete = []
-        search_words = search_text.lower().split()
-        
-        # Get potential message indices from the word index
-        potential_indices = set()
-        if search_words:
-            # Start with indices from the first word
-            potential_indices = set(self.word_index[search_words[0]])
-            # Intersect with indices from other words
-            for word in search_words[1:]:
-                potential_indices &= set(self.word_index[word])
-        
         await status_msg.edit(embed=discord.Embed(
             title="Searching Messages",
-            description=f"Found {len(potential_indices)} potential matches. Verifying...",
+            description=f"Found {len(matches)} matches. Fetching messages...",
             color=discord.Color.blue()
         ))
 
-        # Verify matches and fetch messages
-        for msg_index in potential_indices:
-            msg_data = cached_messages[msg_index]
-            
-            # Check channel filter
-            if current_channel_only and msg_data['channel_id'] != ctx.channel.id:
-                continue
-
-            # Check user filter
-            if target_user and msg_data['author_id'] != target_user.id:
+        messages_to_delete = []
+        for message_id, channel_id in matches:
+            try:
+                channel = ctx.guild.get_channel(channel_id)
+                if channel:
+                    message = await channel.fetch_message(message_id)
+                    messages_to_delete.append(message)
+            except discord.NotFound:
+                # Deleted while the bot was offline
+                index.delete(message_id)
+            except:
                 continue
 
-            # Double check content (for partial word matches)
-            if search_text.lower() in msg_data['content'].lower():
-                try:
-                    channel = ctx.guild.get_channel(msg_data['channel_id'])
-                    if channel:
-                        message = await channel.fetch_message(msg_data['message_id'])
-                        messages_to_delete.append(message)
-                except:
-                    continue
-
         await status_msg.delete()
         return messages_to_delete
 
@@ -1797,37 +1822,46 @@ class AdminCog(commands.Cog):
             print(f"Error saving auto reactions: {e}")
             return False
             
-    def is_cache_recent(self):
-        try:
-            if not os.path.exists(self.last_scan_file) or not os.path.exists(self.message_cache_file):
-                return False
-
-            with open(self.last_scan_file, 'r') as f:
-                last_scan = datetime.fromisoformat(f.read().strip())
-                
-            # Check if cache is less than 24 hours old
-            return (datetime.utcnow() - last_scan).total_seconds() < 86400
-        except:
-            return False
-
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        # Ignore messages from bots
-        if message.author.bot:
+    def refresh_reaction_triggers(self, guild_id):
+        # Compile a guild's trigger terms into one matcher
+        terms = self.auto_reactions.get(guild_id)
+        if not terms:
+            self.reaction_triggers.pop(guild_id, None)
             return
+        items = list(terms.items())
+        matcher = TermMatcher([term.lower() for term, emoji in items])
+        self.reaction_triggers[guild_id] = (matcher, [emoji for term, emoji in items])
+
+    async def auto_reaction_stage(self, mctx):
+        message = mctx.message
             
         # Check if we have auto reactions for this guild
         guild_id = str(message.guild.id) if message.guild else None
-        if not guild_id or guild_id not in self.auto_reactions:
+        triggers = self.reaction_triggers.get(guild_id)
+        if not triggers:
             return
             
-        # Check message content for trigger terms
-        for term, emoji in self.auto_reactions[guild_id].items():
-            if term.lower() in message.content.lower():
-                try:
-                    await message.add_reaction(emoji)
-                except Exception as e:
-                    print(f"Error adding reaction {emoji}: {e}")
+        # Check message content for all trigger terms in one scan
+        matcher, emojis = triggers
+        matched = []
+        for index in matcher.search_all(mctx.content_lower):
+            if emojis[index] not in matched:
+                matched.append(emojis[index])
+        if matched:
+            task = asyncio.create_task(self.send_auto_reactions(message, matched))
+            # The loop only keeps weak references to tasks
+            self.reaction_tasks.add(task)
+            task.add_done_callback(self.reaction_tasks.discard)
+
+    async def send_auto_reactions(self, message, emojis):
+        for emoji in emojis:
+            if not await self.reaction_limiter.acquire(message.channel.id):
+                # Channel is already backed up, drop the rest of this burst
+                return
+            try:
+                await message.add_reaction(emoji)
+            except Exception as e:
+                print(f"Error adding reaction {emoji}: {e}")
     
     @commands.command()
     @has_permissions(administrator=True)
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+
+from jsonstore import atomic_write_json
+from leaderboard import BalanceLeaderboard
+
+
+class BankStore:
+    """In-memory account store for data/bank.json shared by all economy cogs.
+
+    Accounts are loaded once and mutated in place. Callers mark the accounts
+    they changed as dirty, and the store writes the file back atomically on
+    a timer and when the bot shuts down. Marking an account dirty also updates
+    the balance leaderboard.
+    """
+
+    def __init__(self, path='data/bank.json', flush_interval=30):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.users = None
+        self.dirty = set()
+        self.flush_task = None
+        self.flush_lock = asyncio.Lock()
+        self.leaderboard = BalanceLeaderboard()
+
+    def load(self):
+        # Load the bank file once, later calls are served from memory
+        if self.users is not None:
+            return self.users
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        users = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                content = f.read().strip()
+            if content:
+                try:
+                    users = json.loads(content)
+                except json.JSONDecodeError:
+                    print(f"Error reading {self.path}, starting with an empty bank")
+                    users = {}
+
+        self.users = users
+        for user_id, data in users.items():
+            self.update_leaderboard(user_id, data)
+        return self.users
+
+    def update_leaderboard(self, user_id, data):
+        try:
+            self.leaderboard.update(user_id, data.get("wallet", 0) + data.get("bank", 0))
+        except Exception as e:
+            print(f"Skipping bank account {user_id} in leaderboard: {e}")
+
+    def accounts(self):
+        return self.load()
+
+    def get_account(self, user_id):
+        return self.load().get(str(user_id))
+
+    def open_account(self, user_id, wallet=50, bank=0, **extra):
+        # Returns True if a new account was created
+        users = self.load()
+        user_id = str(user_id)
+        if user_id in users:
+            return False
+
+        users[user_id] = {"wallet": wallet, "bank": bank, **extra}
+        self.mark_dirty(user_id)
+        return True
+
+    def mark_dirty(self, user_id):
+        user_id = str(user_id)
+        self.dirty.add(user_id)
+        data = self.load().get(user_id)
+        if data is not None:
+            self.update_leaderboard(user_id, data)
+
+    def snapshot(self):
+        # Copy accounts so the file can be written while commands keep running
+        return {user_id: dict(data) for user_id, data in self.load().items()}
+
+    def write_file(self, users):
+        atomic_write_json(self.path, users)
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.dirty or self.users is None:
+                return False
+
+            dirty = self.dirty
+            self.dirty = set()
+            snapshot = self.snapshot()
+            try:
+                await asyncio.to_thread(self.write_file, snapshot)
+            except Exception as e:
+                # Keep the accounts dirty so the next flush retries them
+                self.dirty |= dirty
+                print(f"Error saving bank data: {e}")
+                return False
+            return True
+
+    async def flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error in bank flush loop: {e}")
+
+    def start(self):
+        self.load()
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush_loop())
+
+    async def close(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        await self.flush()
@@ -5,7 +5,9 @@ import os
 import re
 import asyncio
 from datetime import datetime, timedelta
-import unicodedata
+
+from normalizer import normalize_text
+from termmatcher import GuildTermMatcher
 
 class BlockedTermsCog(commands.Cog):
     def __init__(self, bot):
@@ -13,8 +15,18 @@ class BlockedTermsCog(commands.Cog):
         self.blocked_terms_file = 'data/blockedterms.json'
         self.punishments_file = 'data/punishments.json'
         self.log_channel_id = 1390812291418558546
+        self.blocked_terms = {}  # In-memory copy of blockedterms.json
+        self.matchers = {}  # guild_id -> GuildTermMatcher, rebuilt by blockterm/unblockterm
         # Use asyncio.create_task to run async init
         asyncio.create_task(self.ensure_files_exist())
+
+    async def cog_load(self):
+        self.blocked_terms = await self.load_blocked_terms()
+        self.rebuild_matchers()
+        self.bot.pipeline.register("automod", self.automod_stage, order=10)
+
+    def cog_unload(self):
+        self.bot.pipeline.unregister("automod")
         
     async def ensure_files_exist(self):
         if not os.path.exists(self.blocked_terms_file):
@@ -65,37 +77,26 @@ class BlockedTermsCog(commands.Cog):
         punishments[user_key].append(record)
         await self.save_punishments(punishments)
     
-    async def normalize_text(self, text):
-        # Convert to lowercase
-        text = text.lower()
-        # Remove accents and special characters
-        text = unicodedata.normalize('NFD', text)
-        text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
-        # Remove numbers
-        text = re.sub(r'\d', '', text)
-        # Remove special characters except spaces
-        text = re.sub(r'[^\w\s]', '', text)
-        # Replace multiple repeated characters with single character
-        text = re.sub(r'(.)\1{2,}', r'\1', text)
-        # Remove extra spaces
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+    def rebuild_matchers(self, guild_id=None):
+        # Compile blocked terms per guild, or only for one guild if given
+        guild_ids = {guild_id} if guild_id is not None else {
+            data.get('guild_id') for data in self.blocked_terms.values()
+        }
+        for gid in guild_ids:
+            guild_terms = {term: data for term, data in self.blocked_terms.items()
+                           if data.get('guild_id') == gid}
+            if guild_terms:
+                self.matchers[gid] = GuildTermMatcher(guild_terms, self.normalize_text)
+            else:
+                self.matchers.pop(gid, None)
+
+    def normalize_text(self, text):
+        # Lowercase, strip accents, digits and symbols, collapse repeats and spaces (memoized)
+        return normalize_text(text)
     
     async def check_blocked_term(self, message_content, blocked_terms):
-        normalized_message = await self.normalize_text(message_content)
-        
-        for term, data in blocked_terms.items():
-            if data.get('advanced_filtering', False):
-                # Advanced filtering with normalization
-                normalized_term = await self.normalize_text(term)
-                if normalized_term in normalized_message:
-                    return term, data
-            else:
-                # Simple case-insensitive check
-                if term.lower() in message_content.lower():
-                    return term, data
-        
-        return None, None
+        # One-off check against an arbitrary term dict, messages use the cached matchers
+        return GuildTermMatcher(blocked_terms, self.normalize_text).find(message_content)
 
     async def parse_duration(self, duration_str):
         if not duration_str:
@@ -164,8 +165,10 @@ class BlockedTermsCog(commands.Cog):
             'guild_id': ctx.guild.id
         }
         
-        # Save to file
+        # Save to file and recompile this guild's matcher
         await self.save_blocked_terms(blocked_terms)
+        self.blocked_terms = blocked_terms
+        self.rebuild_matchers(ctx.guild.id)
         
         embed = discord.Embed(
             title="Term Blocked",
@@ -195,8 +198,11 @@ class BlockedTermsCog(commands.Cog):
             await ctx.send(embed=embed)
             return
         
+        guild_id = blocked_terms[term].get('guild_id')
         del blocked_terms[term]
-        self.save_blocked_terms(blocked_terms)
+        await self.save_blocked_terms(blocked_terms)
+        self.blocked_terms = blocked_terms
+        self.rebuild_matchers(guild_id)
         
         embed = discord.Embed(
             title="Term Unblocked",
@@ -246,10 +252,8 @@ class BlockedTermsCog(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    async def automod_stage(self, mctx):
+        message = mctx.message
         
         if not message.guild:
             return
@@ -258,20 +262,17 @@ class BlockedTermsCog(commands.Cog):
         if message.author.guild_permissions.administrator:
             return
         
-        blocked_terms = await self.load_blocked_terms()
-        
-        # Filter terms for this guild
-        guild_terms = {term: data for term, data in blocked_terms.items() 
-                      if data.get('guild_id') == message.guild.id}
-        
-        if not guild_terms:
+        # Compiled terms for this guild
+        matcher = self.matchers.get(message.guild.id)
+        if not matcher:
             return
         
         # Check for blocked terms
-        detected_term, term_data = await self.check_blocked_term(message.content, guild_terms)
+        detected_term, term_data = matcher.find(mctx.content, mctx.content_lower)
         
         if detected_term:
-            # Delete the message
+            # Delete the message, later stages (commands, reactions, xp) are skipped
+            mctx.stop("automod")
             try:
                 await message.delete()
             except discord.NotFound:
@@ -363,21 +364,20 @@ class BlockedTermsCog(commands.Cog):
                         log_embed.add_field(name="Duration", value=term_data.get('duration_str', 'Unknown'), inline=True)
                     await log_channel.send(embed=log_embed)
                 
-                # Set up unmute timer
+                # Set up unmute timer, handled by the persistent moderation timers
                 if duration:
-                    await asyncio.sleep(duration)
-                    try:
-                        await user.remove_roles(muted_role, reason="Automatic unmute")
-                        if log_channel:
-                            unmute_embed = discord.Embed(
-                                title="Auto-Unmute",
-                                description=f"**User:** {user.mention} ({user})\n**Reason:** Mute duration expired",
-                                color=discord.Color.green(),
-                                timestamp=datetime.now()
-                            )
-                            await log_channel.send(embed=unmute_embed)
-                    except discord.NotFound:
-                        pass
+                    await self.bot.mod_timers.schedule(
+                        "remove_role", guild.id, user.id, duration,
+                        role_id=muted_role.id,
+                        channel_id=self.log_channel_id,
+                        notice={
+                            "title": "Auto-Unmute",
+                            "description": f"**User:** {user.mention} ({user})\n**Reason:** Mute duration expired",
+                            "color": discord.Color.green().value,
+                            "timestamp": True,
+                        },
+                        reason="Automatic unmute",
+                    )
             
             elif punishment_type == 'kick':
                 # Add to punishment record
@@ -444,21 +444,19 @@ class BlockedTermsCog(commands.Cog):
                 # Ban user
                 await user.ban(reason=f"Used blocked term: {detected_term}")
                 
-                # Set up unban timer
+                # Set up unban timer, handled by the persistent moderation timers
                 if duration:
-                    await asyncio.sleep(duration)
-                    try:
-                        await guild.unban(user, reason="Automatic unban")
-                        if log_channel:
-                            unban_embed = discord.Embed(
-                                title="Auto-Unban",
-                                description=f"**User:** {user.mention} ({user})\n**Reason:** Ban duration expired",
-                                color=discord.Color.green(),
-                                timestamp=datetime.now()
-                            )
-                            await log_channel.send(embed=unban_embed)
-                    except discord.NotFound:
-                        pass
+                    await self.bot.mod_timers.schedule(
+                        "unban", guild.id, user.id, duration,
+                        channel_id=self.log_channel_id,
+                        notice={
+                            "title": "Auto-Unban",
+                            "description": f"**User:** {user.mention} ({user})\n**Reason:** Ban duration expired",
+                            "color": discord.Color.green().value,
+                            "timestamp": True,
+                        },
+                        reason="Automatic unban",
+                    )
         
         except discord.Forbidden:
             if log_channel:
@@ -0,0 +1,57 @@
+import io
+import time
+
+from PIL import Image
+
+BACKGROUND = (43, 45, 49)
+
+
+def collage_tile_size(grid):
+    # Keep the finished image around 1500px wide at most
+    return 300 if grid <= 5 else 1500 // grid
+
+
+def render_collage(covers, grid, tile):
+    """Composite cover images (encoded bytes or None) into a grid x grid JPEG.
+
+    Runs in a worker process: takes and returns plain bytes only.
+    """
+    canvas = Image.new("RGB", (grid * tile, grid * tile), BACKGROUND)
+    for i, data in enumerate(covers[:grid * grid]):
+        if not data:
+            continue
+        try:
+            cover = Image.open(io.BytesIO(data))
+            # Let the JPEG decoder downscale while decoding when it can
+            cover.draft("RGB", (tile, tile))
+            cover = cover.convert("RGB")
+            if cover.size != (tile, tile):
+                cover = cover.resize((tile, tile), Image.Resampling.LANCZOS)
+        except Exception:
+            continue
+        canvas.paste(cover, ((i % grid) * tile, (i // grid) * tile))
+
+    output = io.BytesIO()
+    canvas.save(output, "JPEG", quality=90)
+    return output.getvalue()
+
+
+if __name__ == "__main__":
+    # Benchmark: python collage.py
+    import random
+
+    covers = []
+    for _ in range(100):
+        cover = Image.new("RGB", (300, 300), tuple(random.randrange(256) for _ in range(3)))
+        buffer = io.BytesIO()
+        cover.save(buffer, "JPEG")
+        covers.append(buffer.getvalue())
+
+    for grid in (3, 5, 10):
+        tile = collage_tile_size(grid)
+        start = time.perf_counter()
+        rounds = 5
+        for _ in range(rounds):
+            image = render_collage(covers, grid, tile)
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"{grid}x{grid} ({grid * tile}px): {elapsed * 1000:7.1f} ms, {len(image) / 1024:.0f} KiB")
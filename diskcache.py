@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+
+
+class DiskCache:
+    """Size-bounded LRU cache of byte blobs stored as files in one directory.
+
+    Keys are hashed into file names. The LRU order and sizes are kept in
+    memory (rebuilt from file access times on start), and the least recently
+    used files are deleted once the directory grows past max_bytes. File IO
+    runs in a worker thread.
+    """
+
+    def __init__(self, directory, max_bytes, extension=''):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.files = OrderedDict()  # file name -> size, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_atime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self.files[name] = size
+            self.total_bytes += size
+
+    def __len__(self):
+        return len(self.files)
+
+    def file_name(self, key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest() + self.extension
+
+    def read_file(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.utime(path)
+        return data
+
+    def write_file(self, path, data):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    async def get(self, key):
+        name = self.file_name(key)
+        if name not in self.files:
+            self.misses += 1
+            return None
+        try:
+            data = await asyncio.to_thread(self.read_file, os.path.join(self.directory, name))
+        except OSError:
+            self.total_bytes -= self.files.pop(name, 0)
+            self.misses += 1
+            return None
+        if name in self.files:
+            self.files.move_to_end(name)
+        self.hits += 1
+        return data
+
+    async def set(self, key, data):
+        name = self.file_name(key)
+        await asyncio.to_thread(self.write_file, os.path.join(self.directory, name), data)
+        self.total_bytes += len(data) - self.files.pop(name, 0)
+        self.files[name] = len(data)
+        await self.evict()
+
+    async def evict(self):
+        stale = []
+        while self.total_bytes > self.max_bytes and len(self.files) > 1:
+            name, size = self.files.popitem(last=False)
+            self.total_bytes -= size
+            stale.append(os.path.join(self.directory, name))
+        if stale:
+            await asyncio.to_thread(self.remove_files, stale)
+
+    def remove_files(self, paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+
+from jsonstore import atomic_write_json
+
+
+class GuildSettings:
+    """In-memory per-guild settings (prefixes and toggles).
+
+    prefix.json keeps its old {guild_id: prefix} layout, every other setting
+    lives in guild_settings.json as {guild_id: {key: value}}. Both files are
+    read once and reloaded only when their modification time changes.
+    """
+
+    def __init__(self, prefix_file='data/prefix.json', settings_file='data/guild_settings.json',
+                 default_prefix='-', watch_interval=30):
+        self.prefix_file = prefix_file
+        self.settings_file = settings_file
+        self.default_prefix = default_prefix
+        self.watch_interval = watch_interval
+        self.prefixes = {}
+        self.settings = {}
+        self.mtimes = {}
+        self.watch_task = None
+        self.reload()
+
+    def read_file(self, path, current=None):
+        # current is the last good copy, kept if the file can't be parsed
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+            atomic_write_json(path, data)
+        except json.JSONDecodeError as e:
+            # Half-written or hand-edited with a typo, never overwrite it.
+            # The mtime is still recorded, so the next edit is picked up.
+            print(f"Error parsing {path}, keeping the previous settings: {e}")
+            data = current if current is not None else {}
+        self.mtimes[path] = self.get_mtime(path)
+        return data
+
+    def get_mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self):
+        self.prefixes = self.read_file(self.prefix_file)
+        self.settings = self.read_file(self.settings_file)
+
+    def reload_if_changed(self):
+        # Pick up edits made to the files while the bot is running
+        changed = False
+        if self.get_mtime(self.prefix_file) != self.mtimes.get(self.prefix_file):
+            self.prefixes = self.read_file(self.prefix_file, self.prefixes)
+            changed = True
+        if self.get_mtime(self.settings_file) != self.mtimes.get(self.settings_file):
+            self.settings = self.read_file(self.settings_file, self.settings)
+            changed = True
+        return changed
+
+    def get_prefix(self, guild_id):
+        if guild_id is None:
+            return self.default_prefix
+        return self.prefixes.get(str(guild_id), self.default_prefix)
+
+    def set_prefix(self, guild_id, prefix):
+        self.prefixes[str(guild_id)] = prefix
+        self.save(self.prefix_file, self.prefixes)
+
+    def get(self, guild_id, key, default=None):
+        return self.settings.get(str(guild_id), {}).get(key, default)
+
+    def set(self, guild_id, key, value):
+        self.settings.setdefault(str(guild_id), {})[key] = value
+        self.save(self.settings_file, self.settings)
+
+    def guild(self, guild_id):
+        # All toggles for one guild, used by message handlers
+        return self.settings.get(str(guild_id), {})
+
+    def save(self, path, data):
+        atomic_write_json(path, data, indent=4)
+        # Our own write should not trigger a reload
+        self.mtimes[path] = self.get_mtime(path)
+
+    async def watch_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.watch_interval)
+                if self.reload_if_changed():
+                    print("Guild settings reloaded from disk")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error reloading guild settings: {e}")
+
+    def start(self):
+        if self.watch_task is None or self.watch_task.done():
+            self.watch_task = asyncio.get_running_loop().create_task(self.watch_loop())
+
+    def stop(self):
+        if self.watch_task:
+            self.watch_task.cancel()
+            self.watch_task = None
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import random
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+class HttpError(Exception):
+    def __init__(self, status, url, text=""):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+        self.text = text
+
+
+class HttpResponse:
+    """Fully read response, so callers can use it like a requests response."""
+
+    def __init__(self, status, headers, content, url):
+        self.status_code = status
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HttpError(self.status_code, self.url, self.text[:200])
+
+
+class HttpClient:
+    """Shared async HTTP client used by all cogs for outbound API calls.
+
+    One pooled aiohttp session, a concurrency limit per host, a timeout per
+    request and retries with exponential backoff for connection errors,
+    429 and 5xx responses. Only GET and HEAD are retried by default, other
+    methods might not be safe to send twice and have to pass retry=True.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+    def __init__(self, total_limit=100, per_host_limit=8, timeout=15, retries=2, backoff=0.5):
+        self.total_limit = total_limit
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = None
+        self.host_limits = {}
+
+    def get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.total_limit, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": "Leurs Discord Bot"}
+            )
+        return self.session
+
+    def host_limit(self, url):
+        host = urlsplit(url).netloc
+        semaphore = self.host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            self.host_limits[host] = semaphore
+        return semaphore
+
+    def build_form(self, data, files):
+        # Multipart bodies can only be sent once, so they're rebuilt per attempt
+        form = aiohttp.FormData()
+        for key, value in (data or {}).items():
+            form.add_field(key, str(value))
+        for key, (filename, content, content_type) in files.items():
+            form.add_field(key, content, filename=filename, content_type=content_type)
+        return form
+
+    async def request(self, method, url, *, params=None, data=None, json=None, files=None,
+                      headers=None, timeout=None, retries=None, retry=None, allow_redirects=True):
+        if retry is None:
+            retry = method.upper() in self.IDEMPOTENT_METHODS
+        if not retry:
+            retries = 0
+        elif retries is None:
+            retries = self.retries
+        if isinstance(params, dict):
+            # aiohttp rejects None values, requests used to drop them
+            params = {key: value for key, value in params.items() if value is not None}
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        if files:
+            headers = {k: v for k, v in (headers or {}).items() if k.lower() != "content-type"}
+
+        attempt = 0
+        while True:
+            delay = None
+            try:
+                async with self.host_limit(url):
+                    body = self.build_form(data, files) if files else data
+                    async with self.get_session().request(
+                        method, url, params=params, data=body, json=json, headers=headers,
+                        timeout=request_timeout, allow_redirects=allow_redirects
+                    ) as resp:
+                        content = await resp.read()
+                        response = HttpResponse(resp.status, dict(resp.headers), content, str(resp.url))
+
+                if response.status_code not in self.RETRY_STATUSES or attempt >= retries:
+                    return response
+
+                retry_after = response.headers.get("Retry-After")
+                if retry_after:
+                    try:
+                        delay = min(float(retry_after), 30)
+                    except ValueError:
+                        delay = None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+
+            if delay is None:
+                delay = self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def head(self, url, **kwargs):
+        # Like requests, HEAD does not follow redirects unless asked to
+        kwargs.setdefault("allow_redirects", False)
+        return await self.request("HEAD", url, **kwargs)
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
@@ -1,28 +1,249 @@
 import discord
 from discord.ext import commands
+import asyncio
+import io
 import json
 import os
 import math # not needed as backup
 import datetime # not needed as backup
 import random # not needed as backup
+import time
 from dotenv import load_dotenv
-import requests
+from collage import collage_tile_size, render_collage
+from diskcache import DiskCache
+from nowplaying import NowPlayingPoller
+from ratelimit import KeyedRateLimiter
+from scrobblestore import ScrobbleStore
+from ttlcache import TTLCache
 
 load_dotenv()
 
 lastfmKey = os.getenv("LAST_FM_KEY")
+# Set to 1 to keep a live now-playing snapshot of all linked users
+lastfmPoller = os.getenv("LASTFM_NOW_PLAYING_POLLER", "0") == "1"
+# Set to 1 to sync scrobble history into data/scrobbles.db (server charts, whoknows)
+lastfmScrobbleSync = os.getenv("LASTFM_SCROBBLE_SYNC", "0") == "1"
+
+# Chart periods in seconds, None is all time
+CHART_PERIODS = {
+    "week": 7 * 24 * 60 * 60,
+    "month": 30 * 24 * 60 * 60,
+    "all": None,
+}
+
+# Collage periods as Last.fm names them
+COLLAGE_PERIODS = {
+    "week": "7day",
+    "month": "1month",
+    "quarter": "3month",
+    "half": "6month",
+    "year": "12month",
+    "all": "overall",
+}
+LASTFM_API_URL = "http://ws.audioscrobbler.com/2.0/"
+
+# Seconds a cached response stays valid, per API method
+LASTFM_CACHE_TTLS = {
+    "user.getRecentTracks": 10,
+    "track.getInfo": 15 * 60,
+    "artist.getInfo": 6 * 60 * 60,
+    "album.getInfo": 6 * 60 * 60,
+    "user.getTopAlbums": 10 * 60,
+}
 
 class LastFMCog(commands.Cog):
     def __init__(self, client):
         self.client = client
+        # Ensure data directory exists
         if not os.path.exists('data'):
             os.makedirs('data')
+        # Discord user id -> LastFM username, kept in sync with data/lastfm.json
+        self.linked_accounts = self.load_linked_accounts()
+        # Max Last.fm requests in flight for one servernowplaying
+        self.fanout_limit = 10
+        # Parsed responses of cacheable methods, see LASTFM_CACHE_TTLS
+        self.response_cache = TTLCache(maxsize=2048)
+        # Cache key -> future of the request already on its way
+        self.inflight = {}
+        # Every Last.fm call waits here, keeps us under ~5 requests/s per API key.
+        # Background polling additionally takes at most 2 of those per second.
+        self.rate_limiter = KeyedRateLimiter(interval=0.2)
+        self.poller = NowPlayingPoller(self.fetch_now_playing, KeyedRateLimiter(interval=0.5))
+        self.poller_task = None
+        # Local scrobble history for charts and whoknows
+        self.scrobbles = ScrobbleStore()
+        self.sync_limiter = KeyedRateLimiter(interval=1.0)
+        self.sync_interval = 15 * 60  # Seconds between incremental syncs
+        self.sync_pages = 20  # Pages of 200 scrobbles per user and sync round
+        self.sync_task = None
+        # First syncs started by login, kept so they aren't garbage collected
+        self.sync_tasks = set()
+        # Album covers for collages, rendering happens in the render service
+        self.artwork_cache = DiskCache('data/artwork', max_bytes=200 * 1024 * 1024)
+
+    async def cog_load(self):
+        if lastfmPoller:
+            self.poller.sync(self.linked_accounts.values())
+            self.poller_task = self.client.loop.create_task(self.poller_loop())
+        if lastfmScrobbleSync:
+            self.sync_task = self.client.loop.create_task(self.scrobble_sync_loop())
+
+    def cog_unload(self):
+        if self.poller_task:
+            self.poller_task.cancel()
+        if self.sync_task:
+            self.sync_task.cancel()
+        for task in self.sync_tasks:
+            task.cancel()
+        self.scrobbles.close()
+
+    async def poller_loop(self):
+        await self.client.wait_until_ready()
+        await self.poller.run()
+
+    async def scrobble_sync_loop(self):
+        await self.client.wait_until_ready()
+        while True:
+            try:
+                for lastfm_username in set(self.linked_accounts.values()):
+                    await self.background_sync(lastfm_username)
+                await asyncio.sleep(self.sync_interval)
+            except asyncio.CancelledError:
+                break
+
+    async def background_sync(self, lastfm_username):
+        try:
+            await self.sync_scrobbles(lastfm_username, self.sync_pages, self.sync_limiter)
+        except Exception as e:
+            print(f"Error syncing scrobbles for {lastfm_username}: {e}")
+
+    def parse_scrobbles(self, data):
+        # [(ts, artist, album, track)] of a getRecentTracks page, without now playing
+        tracks = data.get('recenttracks', {}).get('track', [])
+        if isinstance(tracks, dict):
+            tracks = [tracks]
+        scrobbles = []
+        for track in tracks:
+            if 'date' not in track:
+                continue
+            scrobbles.append((
+                int(track['date']['uts']),
+                track['artist']['#text'],
+                track.get('album', {}).get('#text', ''),
+                track['name']
+            ))
+        return scrobbles
+
+    async def sync_scrobbles(self, lastfm_username, max_pages, limiter=None):
+        # Pull scrobbles newer than the last stored one, oldest page first so an
+        # interrupted or capped sync resumes where it stopped. The window ends at
+        # the start of the sync, so new scrobbles can't shift the pages.
+        # Returns the number of scrobbles fetched.
+        params = {"user": lastfm_username, "limit": 200, "to": int(time.time())}
+        last_ts = await self.scrobbles.last_ts(lastfm_username)
+        if last_ts:
+            params["from"] = last_ts
+
+        async def fetch_page(page):
+            if limiter:
+                await limiter.acquire("sync")
+            response = await self.lastfm_request("user.getRecentTracks", page=page, **params)
+            return response.json()
+
+        first_page = await fetch_page(1)
+        total_pages = int(first_page.get('recenttracks', {}).get('@attr', {}).get('totalPages', 0))
+        if not total_pages:
+            await self.scrobbles.add_scrobbles(lastfm_username, [])
+            return 0
+
+        fetched = 0
+        for page in range(total_pages, max(total_pages - max_pages, 0), -1):
+            data = first_page if page == 1 else await fetch_page(page)
+            scrobbles = self.parse_scrobbles(data)
+            await self.scrobbles.add_scrobbles(lastfm_username, scrobbles)
+            fetched += len(scrobbles)
+        return fetched
+
+    def load_linked_accounts(self):
+        try:
+            with open('data/lastfm.json', 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_linked_accounts(self):
+        with open('data/lastfm.json', 'w') as f:
+            json.dump(self.linked_accounts, f)
+
+    def linked_members(self, guild):
+        # [(member, lastfm_username)] for linked accounts in this guild,
+        # walking whichever of the two sides is smaller
+        if guild.chunked and len(guild.members) < len(self.linked_accounts):
+            return [(member, self.linked_accounts[str(member.id)])
+                    for member in guild.members if str(member.id) in self.linked_accounts]
+        pairs = []
+        for user_id, lastfm_username in self.linked_accounts.items():
+            member = guild.get_member(int(user_id))
+            if member:
+                pairs.append((member, lastfm_username))
+        return pairs
+
+    async def lastfm_request(self, method, raise_for_status=True, **params):
+        # All Last.fm calls go through the shared async HTTP client
+        params = {"method": method, "api_key": lastfmKey, "format": "json", **params}
+        await self.rate_limiter.acquire()
+        response = await self.client.http_client.get(LASTFM_API_URL, params=params)
+        if raise_for_status:
+            response.raise_for_status()
+        return response
+
+    def cache_key(self, method, params):
+        # Last.fm names are case-insensitive, so "The Beatles " == "the beatles"
+        normalized = tuple(sorted(
+            (name, " ".join(str(value).split()).lower()) for name, value in params.items()
+        ))
+        return (method, normalized)
+
+    async def cached_lastfm_json(self, method, **params):
+        # Parsed JSON of a Last.fm call, served from the cache while fresh.
+        # Concurrent calls for the same key share one request, error responses
+        # are returned but not cached.
+        key = self.cache_key(method, params)
+        data = self.response_cache.get(key)
+        if data is not None:
+            return data
+
+        future = self.inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            response = await self.lastfm_request(method, raise_for_status=False, **params)
+            data = response.json()
+            if response.ok and 'error' not in data:
+                self.response_cache.set(key, data, LASTFM_CACHE_TTLS.get(method, 60))
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            # Only waiters should see the exception, not the event loop
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
 
-    # link lastfm account
+    # link lastfm account to bot
     @commands.command()
     async def login(self, ctx, lastfm_username):
         user_id = ctx.author.id
         self.update_user_data(user_id, lastfm_username)
+        if self.sync_task:
+            # Start filling the scrobble history right away
+            task = self.client.loop.create_task(self.background_sync(lastfm_username))
+            self.sync_tasks.add(task)
+            task.add_done_callback(self.sync_tasks.discard)
         embed = discord.Embed(
             title="LastFM Account Linked",
             description=f"Your LastFM account has been linked to Leurs!",
@@ -33,24 +254,13 @@ class LastFMCog(commands.Cog):
         await ctx.send(embed=embed)
 
     def update_user_data(self, user_id, lastfm_username):
-        try: 
-            with open('data/lastfm.json', 'r') as f:
-                user_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            user_data = {}
-
-        user_data[str(user_id)] = lastfm_username
-
-        with open('data/lastfm.json', 'w') as f:
-            json.dump(user_data, f)
+        self.linked_accounts[str(user_id)] = lastfm_username
+        self.save_linked_accounts()
+        if self.poller_task:
+            self.poller.sync(self.linked_accounts.values())
 
     def get_lastfm_username(self, user_id):
-        try:
-            with open('data/lastfm.json', 'r') as f:
-                user_data = json.load(f)
-            return user_data.get(str(user_id))
-        except (FileNotFoundError, json.JSONDecodeError):
-            return None
+        return self.linked_accounts.get(str(user_id))
 
     # show lastfm profile including scrobbles, registered date, total tracks, etc.
     @commands.command(name="lastfm", aliases=["lf", "profile", "me", "p"])
@@ -70,11 +280,8 @@ class LastFMCog(commands.Cog):
             return
 
         # Get user info
-        user_info_url = f"http://ws.audioscrobbler.com/2.0/?method=user.getInfo&user={lastfm_username}&api_key={lastfmKey}&format=json"
-        
         try:
-            response = requests.get(user_info_url)
-            response.raise_for_status()
+            response = await self.lastfm_request("user.getInfo", user=lastfm_username)
             user_info = response.json()['user']
 
             # Extract user information
@@ -100,8 +307,9 @@ class LastFMCog(commands.Cog):
             stats += f"**Account Created:** {registered_date}\n"
             
             # Get recent track count
-            recent_tracks_url = f"http://ws.audioscrobbler.com/2.0/?method=user.getRecentTracks&user={lastfm_username}&api_key={lastfmKey}&format=json&limit=1"
-            recent_response = requests.get(recent_tracks_url)
+            recent_response = await self.lastfm_request(
+                "user.getRecentTracks", raise_for_status=False, user=lastfm_username, limit=1
+            )
             if recent_response.ok:
                 recent_data = recent_response.json()
                 if 'recenttracks' in recent_data and '@attr' in recent_data['recenttracks']:
@@ -120,12 +328,9 @@ class LastFMCog(commands.Cog):
             )
             await ctx.send(embed=embed)
 
-    def get_track_info(self, artist, track):
-        url = f"http://ws.audioscrobbler.com/2.0/?method=track.getInfo&artist={artist}&track={track}&username={self.lastfm_username}&api_key={lastfmKey}&format=json"
+    async def get_track_info(self, artist, track, lastfm_username):
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
+            return await self.cached_lastfm_json("track.getInfo", artist=artist, track=track, username=lastfm_username)
         except:
             return None
      
@@ -147,12 +352,8 @@ class LastFMCog(commands.Cog):
             return
         
         # Get current playing track
-        url = f"http://ws.audioscrobbler.com/2.0/?method=user.getRecentTracks&user={lastfm_username}&api_key={lastfmKey}&format=json&limit=1"
-
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = await self.cached_lastfm_json("user.getRecentTracks", user=lastfm_username, limit=1)
 
             if 'recenttracks' in data and 'track' in data['recenttracks']:
                 tracks = data['recenttracks']['track']
@@ -179,20 +380,15 @@ class LastFMCog(commands.Cog):
                 album = current_track.get('album', {}).get('#text', 'No album info')
                 image_url = current_track.get('image', [])[-1]['#text'] if current_track.get('image') else None
                 
-                # Get track info for playcount
-                track_info_url = f"http://ws.audioscrobbler.com/2.0/?method=track.getInfo&api_key={lastfmKey}&artist={artist}&track={song}&username={lastfm_username}&format=json"
-                track_info = requests.get(track_info_url).json()
+                # Get track, artist and album info for the scrobble counts, in parallel
+                track_info, artist_info, album_info = await asyncio.gather(
+                    self.cached_lastfm_json("track.getInfo", artist=artist, track=song, username=lastfm_username),
+                    self.cached_lastfm_json("artist.getInfo", artist=artist, username=lastfm_username),
+                    self.cached_lastfm_json("album.getInfo", artist=artist, album=album, username=lastfm_username)
+                )
                 
                 playcount = track_info.get('track', {}).get('userplaycount', '0')
-                
-                # Get artist info for scrobble count
-                artist_info_url = f"http://ws.audioscrobbler.com/2.0/?method=artist.getInfo&api_key={lastfmKey}&artist={artist}&username={lastfm_username}&format=json"
-                artist_info = requests.get(artist_info_url).json()
                 artist_scrobbles = artist_info.get('artist', {}).get('stats', {}).get('userplaycount', '0')
-                
-                # Get album info for scrobble count
-                album_info_url = f"http://ws.audioscrobbler.com/2.0/?method=album.getInfo&api_key={lastfmKey}&artist={artist}&album={album}&username={lastfm_username}&format=json"
-                album_info = requests.get(album_info_url).json()
                 album_scrobbles = album_info.get('album', {}).get('userplaycount', '0')
                 
                 # Create embed
@@ -238,50 +434,71 @@ class LastFMCog(commands.Cog):
             )
             await ctx.send(embed=embed)
 
+    async def fetch_now_playing(self, lastfm_username):
+        # {'username', 'song', 'artist'} if the user is playing something, else None
+        data = await self.cached_lastfm_json("user.getRecentTracks", user=lastfm_username, limit=1)
+
+        tracks = data.get('recenttracks', {}).get('track')
+        if not tracks:
+            return None
+        current_track = tracks[0]
+
+        # Check if track is currently playing
+        if current_track.get('@attr', {}).get('nowplaying') != 'true':
+            return None
+
+        return {
+            'username': lastfm_username,
+            'song': current_track['name'],
+            'artist': current_track['artist']['#text']
+        }
+
+    async def get_now_playing(self, lastfm_username):
+        try:
+            now_playing = await self.fetch_now_playing(lastfm_username)
+        except Exception as e:
+            print(f"Error fetching data for {lastfm_username}: {str(e)}")
+            return None
+        # Fresh results also keep the poller snapshot up to date
+        self.poller.record(lastfm_username, now_playing)
+        return now_playing
+
+    async def guild_now_playing(self, linked):
+        # Now-playing entries for [(member, lastfm_username)]. Answered from the
+        # poller snapshot once it has seen all of these users, otherwise every
+        # user is queried concurrently and results are merged as they arrive.
+        usernames = list(dict.fromkeys(lastfm_username for _, lastfm_username in linked))
+        if self.poller_task and self.poller.is_warm(usernames):
+            return self.poller.playing(usernames)
+
+        playing_users = []
+        semaphore = asyncio.Semaphore(self.fanout_limit)
+
+        async def fetch(lastfm_username):
+            async with semaphore:
+                return await self.get_now_playing(lastfm_username)
+
+        tasks = [asyncio.create_task(fetch(lastfm_username)) for lastfm_username in usernames]
+        for next_result in asyncio.as_completed(tasks):
+            now_playing = await next_result
+            if now_playing:
+                playing_users.append(now_playing)
+        return playing_users
+
     @commands.command(aliases=["snp"])
     async def servernowplaying(self, ctx):
+        if ctx.guild is None:
+            await ctx.send("This command can only be used in a server.")
+            return
+
         try:
-            # Load LastFM usernames from json
-            with open('data/lastfm.json', 'r') as f:
-                lastfm_data = json.load(f)
+            linked = self.linked_members(ctx.guild)
             
-            if not lastfm_data:
+            if not linked:
                 await ctx.send("No LastFM accounts are linked to any server members.")
                 return
                 
-            playing_users = []
-            
-            # Check each linked LastFM account
-            for user_id, lastfm_username in lastfm_data.items():
-                # Use the same logic as the np command
-                url = f"http://ws.audioscrobbler.com/2.0/?method=user.getRecentTracks&user={lastfm_username}&api_key={lastfmKey}&format=json&limit=1"
-                
-                try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'recenttracks' in data and 'track' in data['recenttracks']:
-                        tracks = data['recenttracks']['track']
-                        if tracks:
-                            current_track = tracks[0]
-                            
-                            # Check if track is currently playing
-                            is_playing = '@attr' in current_track and current_track['@attr'].get('nowplaying') == 'true'
-                            
-                            if is_playing:
-                                artist = current_track['artist']['#text']
-                                song = current_track['name']
-                                
-                                playing_users.append({
-                                    'username': lastfm_username,
-                                    'song': song,
-                                    'artist': artist
-                                })
-                                
-                except Exception as e:
-                    print(f"Error fetching data for {lastfm_username}: {str(e)}")
-                    continue
+            playing_users = await self.guild_now_playing(linked)
             
             # Create embed
             embed = discord.Embed(
@@ -305,10 +522,10 @@ class LastFMCog(commands.Cog):
                 
                 # Add summary line with same spacing as header
                 description += "\n\n"
-                description += f"Users currently listening: {len(playing_users)} - Total users with LastFM: {len(lastfm_data)}"
+                description += f"Users currently listening: {len(playing_users)} - Total users with LastFM: {len(linked)}"
                 embed.description = description
             else:
-                embed.description = f"No one is currently listening to music\nTotal users with LastFM: {len(lastfm_data)}"
+                embed.description = f"No one is currently listening to music\nTotal users with LastFM: {len(linked)}"
                 
             await ctx.send(embed=embed)
             
@@ -316,378 +533,239 @@ class LastFMCog(commands.Cog):
             print(f"Error in servernowplaying: {str(e)}")
             await ctx.send("An error occurred while fetching currently playing tracks.")
 
-    @commands.command()
-    async def logout(self, ctx):
-        user_id = ctx.author.id
+    @commands.command(aliases=["whoislistening"])
+    async def wholistens(self, ctx, *, artist: str):
+        if ctx.guild is None:
+            await ctx.send("This command can only be used in a server.")
+            return
+
         try:
-            with open('data/lastfm.json', 'r') as f:
-                user_data = json.load(f)
-                
-            if str(user_id) not in user_data:
-                embed = discord.Embed(
-                    title="Not Logged In",
-                    description="You don't have a LastFM account linked.",
-                    color=discord.Color.red()
-                )
-                embed.set_footer(text=f"Requested by {ctx.author.name}", 
-                               icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
-                await ctx.send(embed=embed)
+            linked = self.linked_members(ctx.guild)
+            if not linked:
+                await ctx.send("No LastFM accounts are linked to any server members.")
                 return
-                
-            # Remove the user's data
-            del user_data[str(user_id)]
-            
-            # Save the updated data
-            with open('data/lastfm.json', 'w') as f:
-                json.dump(user_data, f)
-                
+
+            wanted = " ".join(artist.split()).lower()
+            listeners = [
+                user for user in await self.guild_now_playing(linked)
+                if " ".join(user['artist'].split()).lower() == wanted
+            ]
+
             embed = discord.Embed(
-                title="LastFM Account Unlinked",
-                description="Your LastFM account has been unlinked from Leurs!",
-                color=discord.Color.green()
+                title=f"Listening to {artist} in Server",
+                color=0x2b2d31
             )
-            embed.set_footer(text=f"Requested by {ctx.author.name}", 
-                           icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
+            if listeners:
+                lines = []
+                for user in listeners:
+                    track_url = f"https://www.last.fm/music/{user['artist'].replace(' ', '+')}/{user['song'].replace(' ', '+')}"
+                    profile_url = f"https://www.last.fm/user/{user['username']}"
+                    lines.append(f"[{user['username']}]({profile_url}) - [{user['song']}]({track_url})")
+                embed.description = "\n".join(lines)
+            else:
+                embed.description = f"No one is currently listening to {artist}"
+            embed.set_footer(text=f"Users with LastFM: {len(linked)}")
             await ctx.send(embed=embed)
-            
+
         except Exception as e:
-            print(f"Error in logout: {str(e)}")
-            await ctx.send("An error occurred while trying to unlink your LastFM account.")
+            print(f"Error in wholistens: {str(e)}")
+            await ctx.send("An error occurred while fetching currently playing tracks.")
 
-async def setup(client):
-    try:
-        await client.add_cog(LastFMCog(client))
-        print("LastFM cog loaded successfully")
-    except Exception as e:
-        print(f"Error loading LastFM cog: {e}")
+    @commands.command(aliases=["fmupdate"])
+    async def updatescrobbles(self, ctx):
+        lastfm_username = self.get_lastfm_username(ctx.author.id)
+        if not lastfm_username:
+            await ctx.send("You haven't linked your LastFM account yet. Use `-login [username]` to link it!")
+            return
 
-import discord
-from discord.ext import commands
-import json
-import os
-import math # not needed as backup
-import datetime # not needed as backup
-import random # not needed as backup
-from dotenv import load_dotenv
-import requests
+        message = await ctx.send("Updating your scrobbles...")
+        try:
+            fetched = await self.sync_scrobbles(lastfm_username, max_pages=50)
+            await message.edit(content=f"Updated! Fetched {fetched:,} new scrobbles for {lastfm_username}.")
+        except Exception as e:
+            print(f"Error in updatescrobbles: {str(e)}")
+            await message.edit(content="An error occurred while updating your scrobbles.")
 
-load_dotenv()
+    @commands.command(aliases=["st"])
+    async def servertop(self, ctx, chart: str = "artists", period: str = "week"):
+        if ctx.guild is None:
+            await ctx.send("This command can only be used in a server.")
+            return
 
-lastfmKey = os.getenv("LAST_FM_KEY")
+        group = {"artists": "artist", "artist": "artist", "albums": "album", "album": "album",
+                 "tracks": "track", "track": "track"}.get(chart.lower())
+        period = period.lower()
+        if group is None or period not in CHART_PERIODS:
+            await ctx.send("Usage: `-servertop [artists|albums|tracks] [week|month|all]`")
+            return
 
-class LastFMCog(commands.Cog):
-    def __init__(self, client):
-        self.client = client
-        # Ensure data directory exists
-        if not os.path.exists('data'):
-            os.makedirs('data')
+        linked = self.linked_members(ctx.guild)
+        if not linked:
+            await ctx.send("No LastFM accounts are linked to any server members.")
+            return
 
-    # link lastfm account to bot
-    @commands.command()
-    async def login(self, ctx, lastfm_username):
-        user_id = ctx.author.id
-        self.update_user_data(user_id, lastfm_username)
+        since = time.time() - CHART_PERIODS[period] if CHART_PERIODS[period] else None
+        rows = await self.scrobbles.top(group, [lastfm_username for _, lastfm_username in linked], since)
+
+        period_name = {"week": "This Week", "month": "This Month", "all": "All Time"}[period]
         embed = discord.Embed(
-            title="LastFM Account Linked",
-            description=f"Your LastFM account has been linked to Leurs!",
-            color=discord.Color.green()
+            title=f"Top {group.capitalize()}s in {ctx.guild.name} - {period_name}",
+            color=0x2b2d31
         )
-        embed.set_footer(text=f"Requested by {ctx.author.name}", 
-                        icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
+        if rows:
+            lines = []
+            for i, row in enumerate(rows, start=1):
+                *names, plays, listeners = row
+                artist_url = f"https://www.last.fm/music/{names[0].replace(' ', '+')}"
+                if group == "artist":
+                    name = f"[{names[0]}]({artist_url})"
+                else:
+                    name = f"[{names[1]}]({artist_url}/{names[1].replace(' ', '+')}) - {names[0]}"
+                lines.append(f"**{i}.** {name} - {plays:,} plays, {listeners} listeners")
+            embed.description = "\n".join(lines)
+        else:
+            embed.description = "No scrobbles found for this period yet"
+        embed.set_footer(text=f"Users with LastFM: {len(linked)}")
         await ctx.send(embed=embed)
 
-    def update_user_data(self, user_id, lastfm_username):
-        try: 
-            with open('data/lastfm.json', 'r') as f:
-                user_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            user_data = {}
-
-        user_data[str(user_id)] = lastfm_username
-
-        with open('data/lastfm.json', 'w') as f:
-            json.dump(user_data, f)
-
-    def get_lastfm_username(self, user_id):
-        try:
-            with open('data/lastfm.json', 'r') as f:
-                user_data = json.load(f)
-            return user_data.get(str(user_id))
-        except (FileNotFoundError, json.JSONDecodeError):
-            return None
-
-    # show lastfm profile including scrobbles, registered date, total tracks, etc.
-    @commands.command(name="lastfm", aliases=["lf", "profile", "me", "p"])
-    async def lastfm_stats(self, ctx):
-        user_id = ctx.author.id
-        lastfm_username = self.get_lastfm_username(user_id)
-        
-        if not lastfm_username:
-            embed = discord.Embed(
-                title="LastFM Not Linked",
-                description="You haven't linked your LastFM account yet. Use `-login [username]` to link it!",
-                color=discord.Color.red()
-            )
-            embed.set_footer(text=f"Requested by {ctx.author.name}", 
-                           icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
-            await ctx.send(embed=embed)
+    @commands.command(aliases=["wk"])
+    async def whoknows(self, ctx, *, artist: str):
+        if ctx.guild is None:
+            await ctx.send("This command can only be used in a server.")
             return
 
-        # Get user info
-        user_info_url = f"http://ws.audioscrobbler.com/2.0/?method=user.getInfo&user={lastfm_username}&api_key={lastfmKey}&format=json"
-        
-        try:
-            response = requests.get(user_info_url)
-            response.raise_for_status()
-            user_info = response.json()['user']
-
-            # Extract user information
-            total_scrobbles = user_info['playcount']
-            registered = int(user_info['registered']['unixtime'])
-            registered_date = datetime.datetime.fromtimestamp(registered).strftime('%B %d, %Y')
-            profile_url = user_info['url']
-            
-            # Create embed
-            embed = discord.Embed(color=0x2b2d31)
-            embed.set_author(name=f"Last.fm: {lastfm_username}", 
-                           icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url,
-                           url=profile_url)
-
-            # Add user avatar if available
-            if user_info.get('image'):
-                avatar_url = user_info['image'][-1]['#text']
-                if avatar_url:
-                    embed.set_thumbnail(url=avatar_url)
+        linked = self.linked_members(ctx.guild)
+        if not linked:
+            await ctx.send("No LastFM accounts are linked to any server members.")
+            return
 
-            # Add statistics
-            stats = f"**Total Scrobbles:** {total_scrobbles}\n"
-            stats += f"**Account Created:** {registered_date}\n"
-            
-            # Get recent track count
-            recent_tracks_url = f"http://ws.audioscrobbler.com/2.0/?method=user.getRecentTracks&user={lastfm_username}&api_key={lastfmKey}&format=json&limit=1"
-            recent_response = requests.get(recent_tracks_url)
-            if recent_response.ok:
-                recent_data = recent_response.json()
-                if 'recenttracks' in recent_data and '@attr' in recent_data['recenttracks']:
-                    total_tracks = recent_data['recenttracks']['@attr']['total']
-                    stats += f"**Total Tracks:** {total_tracks}"
+        # Scrobble usernames are stored normalized, map them back to members
+        members = {}
+        for member, lastfm_username in linked:
+            members.setdefault(" ".join(lastfm_username.split()).lower(), (member, lastfm_username))
 
-            embed.description = stats
-            
-            await ctx.send(embed=embed)
+        rows = await self.scrobbles.who_knows(artist, list(members))
+        artist_name = await self.scrobbles.artist_name(artist) or artist
 
-        except Exception as e:
-            embed = discord.Embed(
-                title="Error",
-                description=f"Failed to fetch data from Last.fm API: {str(e)}",
-                color=discord.Color.red()
-            )
-            await ctx.send(embed=embed)
+        embed = discord.Embed(
+            title=f"Who knows {artist_name} in {ctx.guild.name}",
+            url=f"https://www.last.fm/music/{artist_name.replace(' ', '+')}",
+            color=0x2b2d31
+        )
+        if rows:
+            lines = []
+            for i, (key, plays) in enumerate(rows, start=1):
+                member, lastfm_username = members[key]
+                profile_url = f"https://www.last.fm/user/{lastfm_username}"
+                lines.append(f"**{i}.** [{member.display_name}]({profile_url}) - **{plays:,}** plays")
+            embed.description = "\n".join(lines)
+        else:
+            embed.description = f"Nobody in this server has scrobbled {artist_name} yet"
+        embed.set_footer(text=f"Users with LastFM: {len(linked)}")
+        await ctx.send(embed=embed)
 
-    def get_track_info(self, artist, track):
-        url = f"http://ws.audioscrobbler.com/2.0/?method=track.getInfo&artist={artist}&track={track}&username={self.lastfm_username}&api_key={lastfmKey}&format=json"
+    async def get_artwork(self, url, semaphore):
+        data = await self.artwork_cache.get(url)
+        if data is not None:
+            return data
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
-        except:
+            async with semaphore:
+                response = await self.client.http_client.get(url, timeout=10)
+        except Exception as e:
+            print(f"Error downloading artwork {url}: {e}")
             return None
-     
-    # show current playing track if there is one
+        if not response.ok:
+            return None
+        await self.artwork_cache.set(url, response.content)
+        return response.content
+
     @commands.command()
-    async def np(self, ctx):
-        user_id = ctx.author.id
-        lastfm_username = self.get_lastfm_username(user_id)
-        
+    async def collage(self, ctx, size: str = "3x3", period: str = "week"):
+        lastfm_username = self.get_lastfm_username(ctx.author.id)
         if not lastfm_username:
-            embed = discord.Embed(
-                title="LastFM Not Linked",
-                description="You haven't linked your LastFM account yet. Use `-login [username]` to link it!",
-                color=discord.Color.red()
-            )
-            embed.set_footer(text=f"Requested by {ctx.author.name}", 
-                           icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
-            await ctx.send(embed=embed)
+            await ctx.send("You haven't linked your LastFM account yet. Use `-login [username]` to link it!")
             return
-        
-        # Get current playing track
-        url = f"http://ws.audioscrobbler.com/2.0/?method=user.getRecentTracks&user={lastfm_username}&api_key={lastfmKey}&format=json&limit=1"
 
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
+            grid = int(size.lower().split("x")[0])
+        except ValueError:
+            grid = 0
+        if not 3 <= grid <= 10 or period.lower() not in COLLAGE_PERIODS:
+            await ctx.send("Usage: `-collage [3x3-10x10] [week|month|quarter|half|year|all]`")
+            return
 
-            if 'recenttracks' in data and 'track' in data['recenttracks']:
-                tracks = data['recenttracks']['track']
-                if not tracks:
-                    raise Exception("No tracks found")
-                
-                current_track = tracks[0]
-                
-                # Check if track is currently playing
-                is_playing = '@attr' in current_track and current_track['@attr'].get('nowplaying') == 'true'
-                
-                if not is_playing:
-                    embed = discord.Embed(
-                        color=0x2b2d31,
-                        description="No track currently playing"
-                    )
-                    embed.set_author(name=f"Last.fm: {lastfm_username}", 
-                                   icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
-                    await ctx.send(embed=embed)
+        try:
+            async with ctx.typing():
+                data = await self.cached_lastfm_json(
+                    "user.getTopAlbums", user=lastfm_username,
+                    period=COLLAGE_PERIODS[period.lower()], limit=grid * grid
+                )
+                albums = data.get('topalbums', {}).get('album', [])
+                if not albums:
+                    await ctx.send("No albums found for this period.")
                     return
-                
-                artist = current_track['artist']['#text']
-                song = current_track['name']
-                album = current_track.get('album', {}).get('#text', 'No album info')
-                image_url = current_track.get('image', [])[-1]['#text'] if current_track.get('image') else None
-                
-                # Get track info for playcount
-                track_info_url = f"http://ws.audioscrobbler.com/2.0/?method=track.getInfo&api_key={lastfmKey}&artist={artist}&track={song}&username={lastfm_username}&format=json"
-                track_info = requests.get(track_info_url).json()
-                
-                playcount = track_info.get('track', {}).get('userplaycount', '0')
-                
-                # Get artist info for scrobble count
-                artist_info_url = f"http://ws.audioscrobbler.com/2.0/?method=artist.getInfo&api_key={lastfmKey}&artist={artist}&username={lastfm_username}&format=json"
-                artist_info = requests.get(artist_info_url).json()
-                artist_scrobbles = artist_info.get('artist', {}).get('stats', {}).get('userplaycount', '0')
-                
-                # Get album info for scrobble count
-                album_info_url = f"http://ws.audioscrobbler.com/2.0/?method=album.getInfo&api_key={lastfmKey}&artist={artist}&album={album}&username={lastfm_username}&format=json"
-                album_info = requests.get(album_info_url).json()
-                album_scrobbles = album_info.get('album', {}).get('userplaycount', '0')
-                
-                # Create embed
-                embed = discord.Embed(color=0x2b2d31)  # Dark theme color
-                
-                # Set author with Last.fm username
-                embed.set_author(name=f"Last.fm: {lastfm_username}", icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
-                
-                # Format track and artist as clickable links
-                artist_url = f"https://www.last.fm/music/{artist.replace(' ', '+')}"
-                track_url = f"https://www.last.fm/music/{artist.replace(' ', '+')}/{song.replace(' ', '+')}"
-                album_url = f"https://www.last.fm/music/{artist.replace(' ', '+')}/{album.replace(' ', '+')}"
 
-                # Add thumbnail first to ensure it doesn't affect text layout
-                if image_url:
-                    embed.set_thumbnail(url=image_url)
-                
-                # Create content with track and artist info
-                left_content = "Track\n"
-                left_content += f"[{song}]({track_url})\n"
-                left_content += "Artist\n"
-                left_content += f"[{artist}]({artist_url})\n"
-                left_content += "Album\n"
-                left_content += f"[{album}]({album_url})"
-                
-                # Add content
-                embed.description = left_content
-                                                
-                # Add scrobble stats at the bottom (artist, album, track, total)
-                total_scrobbles = data['recenttracks']['@attr']['total']
-                scrobble_stats = f"{artist_scrobbles} artist scrobbles • {album_scrobbles} album scrobbles\n{playcount} track scrobbles • {total_scrobbles} total scrobbles"
-                embed.add_field(name="", value=scrobble_stats, inline=False)
-                
-                await ctx.send(embed=embed)
-            else:
-                raise Exception("No track data found")
-                
+                # Download missing covers concurrently, cached ones come from disk
+                semaphore = asyncio.Semaphore(16)
+                urls = [album['image'][-1]['#text'] if album.get('image') else '' for album in albums]
+                covers = await asyncio.gather(*[
+                    self.get_artwork(url, semaphore) if url else asyncio.sleep(0)
+                    for url in urls
+                ])
+
+                image = await self.client.render_service.render(
+                    render_collage, covers, grid, collage_tile_size(grid)
+                )
+
+            embed = discord.Embed(color=0x2b2d31)
+            embed.set_author(name=f"{lastfm_username}'s {grid}x{grid} {period.lower()} collage",
+                             icon_url=ctx.author.avatar.url if ctx.author.avatar else ctx.author.default_avatar.url)
+            embed.set_image(url="attachment://collage.jpg")
+            await ctx.send(embed=embed, file=discord.File(io.BytesIO(image), filename="collage.jpg"))
+
         except Exception as e:
-            embed = discord.Embed(
-                title="Error",
-                description=f"Failed to fetch data from Last.fm API: {str(e)}",
-                color=discord.Color.red()
-            )
-            await ctx.send(embed=embed)
+            print(f"Error in collage: {str(e)}")
+            await ctx.send("An error occurred while creating your collage.")
 
-    @commands.command(aliases=["snp"])
-    async def servernowplaying(self, ctx):
-        try:
-            # Load LastFM usernames from json
-            with open('data/lastfm.json', 'r') as f:
-                lastfm_data = json.load(f)
-            
-            if not lastfm_data:
-                await ctx.send("No LastFM accounts are linked to any server members.")
-                return
-                
-            playing_users = []
-            
-            # Check each linked LastFM account
-            for user_id, lastfm_username in lastfm_data.items():
-                # Use the same logic as the np command
-                url = f"http://ws.audioscrobbler.com/2.0/?method=user.getRecentTracks&user={lastfm_username}&api_key={lastfmKey}&format=json&limit=1"
-                
-                try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'recenttracks' in data and 'track' in data['recenttracks']:
-                        tracks = data['recenttracks']['track']
-                        if tracks:
-                            current_track = tracks[0]
-                            
-                            # Check if track is currently playing
-                            is_playing = '@attr' in current_track and current_track['@attr'].get('nowplaying') == 'true'
-                            
-                            if is_playing:
-                                artist = current_track['artist']['#text']
-                                song = current_track['name']
-                                
-                                playing_users.append({
-                                    'username': lastfm_username,
-                                    'song': song,
-                                    'artist': artist
-                                })
-                                
-                except Exception as e:
-                    print(f"Error fetching data for {lastfm_username}: {str(e)}")
-                    continue
-            
-            # Create embed
-            embed = discord.Embed(
-                title="Currently Playing in Server",
-                color=0x2b2d31
+    @commands.command(name="lastfmcache")
+    @commands.has_permissions(administrator=True)
+    async def lastfm_cache_stats(self, ctx):
+        cache = self.response_cache
+        embed = discord.Embed(
+            title="Last.fm Cache",
+            description=f"Entries: **{len(cache):,}** / {cache.maxsize:,}\n"
+                        f"Hits: **{cache.hits:,}** | Misses: **{cache.misses:,}**\n"
+                        f"Hit rate: **{cache.hit_rate:.1%}**",
+            color=0x2b2d31
+        )
+        artwork = self.artwork_cache
+        embed.add_field(
+            name="Artwork Cache",
+            value=f"Covers: **{len(artwork):,}** | Size: **{artwork.total_bytes / 1024 / 1024:.1f} MB**\n"
+                  f"Hits: **{artwork.hits:,}** | Misses: **{artwork.misses:,}**",
+            inline=False
+        )
+        scrobbles, synced_users = await self.scrobbles.stats()
+        embed.add_field(
+            name="Scrobble Warehouse",
+            value=f"Scrobbles: **{scrobbles:,}** | Synced users: **{synced_users:,}**",
+            inline=False
+        )
+        if self.poller_task:
+            poller = self.poller
+            embed.add_field(
+                name="Now Playing Poller",
+                value=f"Tracked: **{len(poller.due):,}** | Playing: **{len(poller.snapshot):,}**\n"
+                      f"Polls: **{poller.polls:,}** | Errors: **{poller.errors:,}**",
+                inline=False
             )
-            
-            if playing_users:
-                description = "\n"  # Add initial spacing after header
-                for i, user in enumerate(playing_users):
-                    # Create clickable links
-                    artist_url = f"https://www.last.fm/music/{user['artist'].replace(' ', '+')}"
-                    track_url = f"https://www.last.fm/music/{user['artist'].replace(' ', '+')}/{user['song'].replace(' ', '+')}"
-                    profile_url = f"https://www.last.fm/user/{user['username']}"
-                    
-                    description += f"[{user['username']}]({profile_url})\n"
-                    description += f"[{user['song']}]({track_url}) - [{user['artist']}]({artist_url})"
-                    
-                    if i < len(playing_users) - 1:
-                        description += "\n\n"
-                
-                # Add summary line with same spacing as header
-                description += "\n\n"
-                description += f"Users currently listening: {len(playing_users)} - Total users with LastFM: {len(lastfm_data)}"
-                embed.description = description
-            else:
-                embed.description = f"No one is currently listening to music\nTotal users with LastFM: {len(lastfm_data)}"
-                
-            await ctx.send(embed=embed)
-            
-        except Exception as e:
-            print(f"Error in servernowplaying: {str(e)}")
-            await ctx.send("An error occurred while fetching currently playing tracks.")
+        await ctx.send(embed=embed)
 
     @commands.command()
     async def logout(self, ctx):
         user_id = ctx.author.id
         try:
-            with open('data/lastfm.json', 'r') as f:
-                user_data = json.load(f)
-                
-            if str(user_id) not in user_data:
+            if str(user_id) not in self.linked_accounts:
                 embed = discord.Embed(
                     title="Not Logged In",
                     description="You don't have a LastFM account linked.",
@@ -698,12 +776,13 @@ class LastFMCog(commands.Cog):
                 await ctx.send(embed=embed)
                 return
                 
-            # Remove the user's data
-            del user_data[str(user_id)]
-            
-            # Save the updated data
-            with open('data/lastfm.json', 'w') as f:
-                json.dump(user_data, f)
+            # Remove the user's data and save
+            lastfm_username = self.linked_accounts.pop(str(user_id))
+            self.save_linked_accounts()
+            if lastfm_username not in self.linked_accounts.values():
+                await self.scrobbles.forget(lastfm_username)
+            if self.poller_task:
+                self.poller.sync(self.linked_accounts.values())
                 
             embed = discord.Embed(
                 title="LastFM Account Unlinked",
@@ -0,0 +1,174 @@
+import random
+
+
+class _Node:
+    __slots__ = ("key", "priority", "left", "right", "size")
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.size = 1
+
+
+def _size(node):
+    return node.size if node else 0
+
+
+def _update(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node, key):
+    # Split into (< key, >= key)
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        _update(node)
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    _update(node)
+    return left, node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class OrderStatisticTree:
+    """Treap of unique, sortable keys with subtree sizes.
+
+    insert, remove, rank and select all run in O(log n) expected time.
+    """
+
+    def __init__(self):
+        self.root = None
+
+    def __len__(self):
+        return _size(self.root)
+
+    def insert(self, key):
+        left, right = _split(self.root, key)
+        self.root = _merge(_merge(left, _Node(key)), right)
+
+    def remove(self, key):
+        left, right = _split(self.root, key)
+        # Drop the single node equal to key from the right part
+        node, rest = _split_first(right)
+        if node is not None and node.key != key:
+            rest = _merge(node, rest)
+        self.root = _merge(left, rest)
+
+    def rank(self, key):
+        # Number of keys smaller than key
+        node = self.root
+        rank = 0
+        while node:
+            if key <= node.key:
+                node = node.left
+            else:
+                rank += _size(node.left) + 1
+                node = node.right
+        return rank
+
+    def select(self, index):
+        node = self.root
+        while node:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.key
+            else:
+                index -= left_size + 1
+                node = node.right
+        raise IndexError(index)
+
+    def slice(self, start, stop):
+        # Keys with rank in [start, stop), in order
+        result = []
+        self._collect(self.root, start, stop, 0, result)
+        return result
+
+    def _collect(self, node, start, stop, offset, result):
+        if node is None or offset >= stop:
+            return
+        left_size = _size(node.left)
+        node_rank = offset + left_size
+        if start < node_rank:
+            self._collect(node.left, start, stop, offset, result)
+        if start <= node_rank < stop:
+            result.append(node.key)
+        if node_rank + 1 < stop:
+            self._collect(node.right, start, stop, node_rank + 1, result)
+
+
+def _split_first(node):
+    # Detach the smallest node, returns (node, rest)
+    if node is None:
+        return None, None
+    if node.left is None:
+        rest = node.right
+        node.right = None
+        _update(node)
+        return node, rest
+    first, node.left = _split_first(node.left)
+    _update(node)
+    return first, node
+
+
+class BalanceLeaderboard:
+    """Accounts ordered by total balance (wallet + bank), highest first."""
+
+    def __init__(self):
+        self.tree = OrderStatisticTree()
+        self.totals = {}
+
+    def __len__(self):
+        return len(self.totals)
+
+    def key(self, user_id, total):
+        # Negated so the richest account has rank 0, ties ordered by id
+        return (-total, user_id)
+
+    def update(self, user_id, total):
+        user_id = str(user_id)
+        old_total = self.totals.get(user_id)
+        if old_total == total:
+            return
+        if old_total is not None:
+            self.tree.remove(self.key(user_id, old_total))
+        self.tree.insert(self.key(user_id, total))
+        self.totals[user_id] = total
+
+    def remove(self, user_id):
+        user_id = str(user_id)
+        old_total = self.totals.pop(user_id, None)
+        if old_total is not None:
+            self.tree.remove(self.key(user_id, old_total))
+
+    def rank(self, user_id):
+        # 1-based position, None if the user has no account
+        user_id = str(user_id)
+        total = self.totals.get(user_id)
+        if total is None:
+            return None
+        return self.tree.rank(self.key(user_id, total)) + 1
+
+    def page(self, start, count):
+        # [(user_id, total), ...] for positions start .. start + count - 1 (0-based)
+        return [(user_id, -neg_total) for neg_total, user_id in self.tree.slice(start, start + count)]
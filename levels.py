@@ -7,6 +7,8 @@ import datetime
 import random
 import asyncio
 
+from jsonstore import atomic_write_json
+
 class LevelsCog(commands.Cog):
     def __init__(self, client):
         self.client = client
@@ -17,50 +19,102 @@ class LevelsCog(commands.Cog):
         self.window_start = {}  # Track when the 60-second window started
         # Voice tracking
         self.voice_users = {}  # Track users in voice channels
-        self.voice_task = None  # Task for periodic voice time updates
+        self.voice_task = None  # Task for periodic voice time checkpoints
+        self.voice_checkpoint_interval = 60  # Seconds between voice_levels.json writes
+        self.voice_data = None  # In-memory copy of voice_levels.json
+        self.voice_dirty = False
+        # Batched XP writes
+        self.levels_data = None  # In-memory copy of levels.json
+        self.xp_buffer = {}  # Pending XP, message count and last_message per user
+        self.levels_dirty = False  # Set when levels_data changed outside the buffer
+        self.flush_interval = 5  # Seconds between levels.json writes
+        self.flush_task = None
         
     def cog_unload(self):
+        self.client.pipeline.unregister("xp")
         if self.voice_task:
             self.voice_task.cancel()
+        if self.flush_task:
+            self.flush_task.cancel()
+        # Write anything still buffered
+        try:
+            if self.apply_xp_buffer() or self.levels_dirty:
+                atomic_write_json('data/levels.json', self.levels_data)
+                self.levels_dirty = False
+            if self.voice_dirty:
+                atomic_write_json('data/voice_levels.json', self.voice_data, 4)
+                self.voice_dirty = False
+        except Exception as e:
+            print(f"Error saving levels data on unload: {e}")
             
     async def cog_load(self):
         self.voice_task = self.client.loop.create_task(self.voice_time_tracker())
+        self.flush_task = self.client.loop.create_task(self.levels_flush_loop())
+        self.client.pipeline.register("xp", self.xp_stage, order=50)
+
+    async def levels_flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush_levels_data()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error in levels flush loop: {e}")
+
+    async def flush_pending(self):
+        # Checkpoint open voice sessions, then write buffered XP
+        await self.checkpoint_voice_sessions()
+        await self.flush_levels_data()
+
+    async def flush_levels_data(self):
+        # Apply buffered XP and write levels.json once for all of it
+        if not self.apply_xp_buffer() and not self.levels_dirty:
+            return
+        self.levels_dirty = False
+        snapshot = {user_id: dict(data) for user_id, data in self.levels_data.items()}
+        try:
+            await asyncio.to_thread(atomic_write_json, 'data/levels.json', snapshot)
+        except Exception as e:
+            self.levels_dirty = True
+            print(f"Error saving levels data: {e}")
+
+    def apply_xp_buffer(self):
+        # Merge pending deltas into the in-memory levels data, returns True if anything changed
+        if not self.xp_buffer:
+            return False
+        users = self.load_levels_data()
+        for user_id, pending in self.xp_buffer.items():
+            entry = users.setdefault(user_id, self.new_level_entry())
+            entry["xp"] = entry.get("xp", 0) + pending["xp"]
+            entry["total_messages"] = entry.get("total_messages", 0) + pending["total_messages"]
+            entry["last_message"] = pending["last_message"]
+            if pending["level"] is not None:
+                entry["level"] = max(entry.get("level", 0), pending["level"])
+        self.xp_buffer = {}
+        return True
+
+    def new_level_entry(self):
+        return {
+            "xp": 0,
+            "level": 0,
+            "total_messages": 0,
+            "last_message": 0
+        }
+
+    async def save_levels_data(self):
+        # Mark levels.json for the next flush
+        self.levels_dirty = True
         
     async def voice_time_tracker(self):
         try:
+            await self.client.wait_until_ready()
+            # Pick up users who were already in voice when the bot started
+            self.open_existing_voice_sessions()
             while True:
-                # Update all users currently in voice channels
-                for guild in self.client.guilds:
-                    for member in guild.members:
-                        if member.voice and member.voice.channel and not member.voice.afk and not member.bot:
-                            user_id = str(member.id)
-                            if user_id not in self.voice_users:
-                                self.voice_users[user_id] = {
-                                    "start_time": datetime.datetime.now().timestamp(),
-                                    "channel_id": member.voice.channel.id
-                                }
-                            else:
-                                # Calculate and save time
-                                current_time = datetime.datetime.now().timestamp()
-                                start_time = self.voice_users[user_id]["start_time"]
-                                time_spent = current_time - start_time
-                                
-                                # Update voice data
-                                voice_data = await self.get_voice_data()
-                                if user_id not in voice_data:
-                                    voice_data[user_id] = {"voice_time": 0}
-                                
-                                voice_data[user_id]["voice_time"] = voice_data[user_id].get("voice_time", 0) + time_spent
-                                
-                                # Save voice data
-                                with open('data/voice_levels.json', 'w') as f:
-                                    json.dump(voice_data, f, indent=4)
-                                
-                                # Reset start time for next interval
-                                self.voice_users[user_id]["start_time"] = current_time
-                
-                # Wait for 60 seconds before next update
-                await asyncio.sleep(60)
+                # Wait for 60 seconds before the next checkpoint
+                await asyncio.sleep(self.voice_checkpoint_interval)
+                await self.checkpoint_voice_sessions()
         except asyncio.CancelledError:
             # Handle task cancellation
             pass
@@ -68,20 +122,60 @@ class LevelsCog(commands.Cog):
             print(f"Error in voice time tracker: {e}")
             # Restart the task if it fails
             self.voice_task = self.client.loop.create_task(self.voice_time_tracker())
-        
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        # Don't process bot messages
-        if message.author.bot:
+
+    def open_existing_voice_sessions(self):
+        # Only voice channel members are visited, not every guild member
+        current_time = datetime.datetime.now().timestamp()
+        for guild in self.client.guilds:
+            for channel in guild.voice_channels:
+                if channel.id == getattr(guild.afk_channel, "id", None):
+                    continue
+                for member in channel.members:
+                    if member.bot:
+                        continue
+                    self.voice_users.setdefault(str(member.id), {
+                        "start_time": current_time,
+                        "channel_id": channel.id
+                    })
+
+    def credit_voice_time(self, user_id, time_spent):
+        voice_data = self.load_voice_data()
+        if user_id not in voice_data:
+            voice_data[user_id] = {"voice_time": 0}
+        voice_data[user_id]["voice_time"] = voice_data[user_id].get("voice_time", 0) + time_spent
+        self.voice_dirty = True
+
+    def close_voice_session(self, user_id, current_time):
+        session = self.voice_users.pop(user_id, None)
+        if session:
+            self.credit_voice_time(user_id, current_time - session["start_time"])
+
+    async def checkpoint_voice_sessions(self):
+        # Credit all open sessions up to now and write voice_levels.json once
+        current_time = datetime.datetime.now().timestamp()
+        for user_id, session in self.voice_users.items():
+            self.credit_voice_time(user_id, current_time - session["start_time"])
+            session["start_time"] = current_time
+        await self.save_voice_data()
+
+    async def save_voice_data(self):
+        if not self.voice_dirty:
             return
-            
-        # Don't process commands
-        ctx = await self.client.get_context(message)
-        if ctx.valid:
+        self.voice_dirty = False
+        snapshot = {user_id: dict(data) for user_id, data in self.voice_data.items()}
+        try:
+            await asyncio.to_thread(atomic_write_json, 'data/voice_levels.json', snapshot, 4)
+        except Exception as e:
+            self.voice_dirty = True
+            print(f"Error saving voice data: {e}")
+        
+    async def xp_stage(self, mctx):
+        # Don't process commands, the context was already parsed by the pipeline
+        if mctx.is_command:
             return
             
         # Handle XP gain
-        await self.add_xp(message.author, message.channel)
+        await self.add_xp(mctx.message.author, mctx.message.channel)
         
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
@@ -100,63 +194,22 @@ class LevelsCog(commands.Cog):
             
         # User left a voice channel
         elif before.channel and not after.channel:
-            if user_id in self.voice_users:
-                # Calculate final time for this session
-                start_time = self.voice_users[user_id]["start_time"]
-                time_spent = current_time - start_time
-                
-                # Update voice data
-                voice_data = await self.get_voice_data()
-                if user_id not in voice_data:
-                    voice_data[user_id] = {"voice_time": 0}
-                
-                voice_data[user_id]["voice_time"] = voice_data[user_id].get("voice_time", 0) + time_spent
-                
-                # Save voice data
-                with open('data/voice_levels.json', 'w') as f:
-                    json.dump(voice_data, f, indent=4)
-                    
-                # Remove user from tracking
-                del self.voice_users[user_id]
+            # Time is credited in memory and written with the next checkpoint
+            self.close_voice_session(user_id, current_time)
                 
         # User switched channels
         elif before.channel and after.channel and before.channel != after.channel:
             if after.channel.afk:  # Moving to AFK
-                if user_id in self.voice_users:
-                    # Calculate time until moving to AFK
-                    start_time = self.voice_users[user_id]["start_time"]
-                    time_spent = current_time - start_time
-                    
-                    # Update voice data
-                    voice_data = await self.get_voice_data()
-                    if user_id not in voice_data:
-                        voice_data[user_id] = {"voice_time": 0}
-                    
-                    voice_data[user_id]["voice_time"] = voice_data[user_id].get("voice_time", 0) + time_spent
-                    
-                    # Save voice data
-                    with open('data/voice_levels.json', 'w') as f:
-                        json.dump(voice_data, f, indent=4)
-                    
-                    # Remove user from tracking
-                    del self.voice_users[user_id]
-            elif not after.channel.afk:  # Moving to a non-AFK channel
-                if before.channel.afk:  # Coming from AFK
-                    # Start fresh tracking
-                    self.voice_users[user_id] = {
-                        "start_time": current_time,
-                        "channel_id": after.channel.id
-                    }
-                else:  # Moving between normal channels
-                    # Update channel ID but keep the same start time
-                    if user_id in self.voice_users:
-                        self.voice_users[user_id]["channel_id"] = after.channel.id
-                    else:
-                        # Start tracking if not already tracking
-                        self.voice_users[user_id] = {
-                            "start_time": current_time,
-                            "channel_id": after.channel.id
-                        }
+                self.close_voice_session(user_id, current_time)
+            elif before.channel.afk or user_id not in self.voice_users:  # Coming from AFK or not tracked yet
+                # Start fresh tracking
+                self.voice_users[user_id] = {
+                    "start_time": current_time,
+                    "channel_id": after.channel.id
+                }
+            else:  # Moving between normal channels
+                # Update channel ID but keep the same start time
+                self.voice_users[user_id]["channel_id"] = after.channel.id
         
     async def add_xp(self, user, channel):
         # Anti-spam mechanism (max 60 messages per minute)
@@ -183,13 +236,15 @@ class LevelsCog(commands.Cog):
         if xp_gained < 5:
             xp_gained = 5  # Minimum XP gain
             
-        # Get current user data
-        users = await self.get_levels_data()
-        await self.check_user(user)
+        # Current stats are the stored values plus anything still buffered
+        stored = self.load_levels_data().get(user_id) or self.new_level_entry()
+        pending = self.xp_buffer.get(user_id)
+        if pending is None:
+            pending = {"xp": 0, "total_messages": 0, "last_message": 0, "level": None}
+            self.xp_buffer[user_id] = pending
         
-        # Get current level
-        current_level = users[user_id]["level"]
-        current_xp = users[user_id]["xp"]
+        current_level = pending["level"] if pending["level"] is not None else stored.get("level", 0)
+        current_xp = stored.get("xp", 0) + pending["xp"]
         new_xp = current_xp + xp_gained
         
         # Calculate if user leveled up
@@ -198,16 +253,12 @@ class LevelsCog(commands.Cog):
         
         if new_level > current_level:
             level_up = True
-            users[user_id]["level"] = new_level
+            pending["level"] = new_level
             
-        # Update user data
-        users[user_id]["xp"] = new_xp
-        users[user_id]["total_messages"] += 1
-        users[user_id]["last_message"] = current_time
-        
-        # Save data
-        with open('data/levels.json', 'w') as f:
-            json.dump(users, f)
+        # Buffer the update, it is written with the next flush
+        pending["xp"] += xp_gained
+        pending["total_messages"] += 1
+        pending["last_message"] = current_time
             
         # Send level up message if user leveled up
         if level_up and channel:
@@ -231,14 +282,8 @@ class LevelsCog(commands.Cog):
             
             # Create user data if it doesn't exist
             if user_id not in users:
-                users[user_id] = {
-                    "xp": 0,
-                    "level": 0,
-                    "total_messages": 0,
-                    "last_message": 0
-                }
-                with open('data/levels.json', 'w') as f:
-                    json.dump(users, f, indent=4)
+                users[user_id] = self.new_level_entry()
+                await self.save_levels_data()
             
             # Get message data
             xp = users[user_id]["xp"]
@@ -531,66 +576,62 @@ class LevelsCog(commands.Cog):
         user_id = str(user.id)
         
         if user_id not in users:
-            users[user_id] = {
-                "xp": 0,
-                "level": 0,
-                "total_messages": 0,
-                "last_message": 0
-            }
+            users[user_id] = self.new_level_entry()
             
             # Save updated data
-            with open('data/levels.json', 'w') as f:
-                json.dump(users, f)
+            await self.save_levels_data()
                 
         return True
         
-    async def get_levels_data(self):
+    def load_levels_data(self):
+        # Read levels.json once, afterwards the in-memory copy is authoritative
+        if self.levels_data is not None:
+            return self.levels_data
+
         if not os.path.exists('data'):
             os.makedirs('data')
         
-        if not os.path.exists('data/levels.json'):
-            with open('data/levels.json', 'w') as f:
-                json.dump({}, f)
-
-        with open('data/levels.json', 'r') as f:
-            content = f.read().strip()
-            if not content:
-                users = {}
-            else:
+        users = {}
+        if os.path.exists('data/levels.json'):
+            with open('data/levels.json', 'r') as f:
+                content = f.read().strip()
+            if content:
                 try:
                     users = json.loads(content)
                 except json.JSONDecodeError:
                     users = {}
-            
-        if not content:
-            with open('data/levels.json', 'w') as f:
-                json.dump(users, f)
-                
-        return users
+                    
+        self.levels_data = users
+        return self.levels_data
+
+    async def get_levels_data(self):
+        # Fold buffered XP in so readers see up-to-date stats
+        self.apply_xp_buffer()
+        return self.load_levels_data()
+
+    def load_voice_data(self):
+        # Read voice_levels.json once, afterwards the in-memory copy is authoritative
+        if self.voice_data is not None:
+            return self.voice_data
 
-    async def get_voice_data(self):
         if not os.path.exists('data'):
             os.makedirs('data')
         
-        if not os.path.exists('data/voice_levels.json'):
-            with open('data/voice_levels.json', 'w') as f:
-                json.dump({}, f)
-
-        with open('data/voice_levels.json', 'r') as f:
-            content = f.read().strip()
-            if not content:
-                users = {}
-            else:
+        users = {}
+        if os.path.exists('data/voice_levels.json'):
+            with open('data/voice_levels.json', 'r') as f:
+                content = f.read().strip()
+            if content:
                 try:
                     users = json.loads(content)
                 except json.JSONDecodeError:
                     users = {}
-            
-        if not content:
-            with open('data/voice_levels.json', 'w') as f:
-                json.dump(users, f)
-                
-        return users
+                    
+        self.voice_data = users
+        return self.voice_data
+
+    async def get_voice_data(self):
+        return self.load_voice_data()
 
     @commands.command()
     @commands.has_permissions(administrator=True)
@@ -620,8 +661,7 @@ class LevelsCog(commands.Cog):
             users[user_id]["last_message"] = datetime.datetime.now().timestamp()
             
             # Save updated data
-        with open('data/levels.json', 'w') as f:
-            json.dump(users, f, indent=4)
+        await self.save_levels_data()
             
         embed = discord.Embed(
             title="Level Updated",
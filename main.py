@@ -20,6 +20,12 @@ from birthday import BirthdayCog
 from timezone import TimezoneCog
 from snipe import SnipeCog
 from blockedterms import BlockedTermsCog
+from bankstore import BankStore
+from guildsettings import GuildSettings
+from pipeline import MessagePipeline
+from httpclient import HttpClient
+from renderservice import RenderService
+from modtimers import ModerationTimers
 # Import your new cog here
 # from mycog import MyCog
 
@@ -29,20 +35,9 @@ os.chdir(os.path.dirname(os.path.abspath(__file__)))
 if not os.path.exists('data'):
     os.makedirs('data')
 
-# Load or create prefix configuration
-def load_prefix_config():
-    try:
-        with open('data/prefix.json', 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        with open('data/prefix.json', 'w') as f:
-            json.dump({}, f)
-        return {}
-
 def get_prefix(bot, message):
-    prefixes = load_prefix_config()
-    # Default prefix if no custom prefix is set
-    return prefixes.get(str(message.guild.id), '-')
+    # Served from memory, the default prefix is used if no custom prefix is set
+    return bot.guild_settings.get_prefix(message.guild.id if message.guild else None)
 
 async def check_cooldown(ctx):
     # Skip cooldown for administrators
@@ -73,16 +68,60 @@ class CustomBot(commands.Bot):
         super().__init__(*args, **kwargs)
         # Create a global cooldown for all users (1 command per 2 seconds)
         self.cooldown_bucket = commands.CooldownMapping.from_cooldown(1, 3, commands.BucketType.user)
-        
+        # Shared in-memory account store for bank.json, flushed in the background
+        self.bank_store = BankStore('data/bank.json')
+        # Cached per-guild settings (prefixes and toggles)
+        self.guild_settings = GuildSettings()
+        # Shared async HTTP client for all outbound API calls
+        self.http_client = HttpClient()
+        # Process pool for Pillow image rendering, keeps the event loop free
+        self.render_service = RenderService()
+        # Persistent expiry timers for mutes, jails, temporary roles and bans
+        self.mod_timers = ModerationTimers(self)
+        # Single on_message pipeline, cogs register their stages on load
+        self.pipeline = MessagePipeline(self)
+        self.pipeline.register("commands", self.command_stage, order=20)
+        # Commands running in the background, see run_command
+        self.command_tasks = set()
+
+    async def on_message(self, message):
+        if message.author.bot:
+            return
+        await self.pipeline.process(message)
+
+    async def command_stage(self, mctx):
+        await self.run_command(mctx.command_ctx)
+
     async def process_commands(self, message):
+        # Only the command part of the pipeline, for cogs that call it directly
         if message.author.bot:
             return
+        await self.run_command(await self.get_context(message))
 
-        ctx = await self.get_context(message)
+    async def run_command(self, ctx):
         if ctx.valid and ctx.command:
             # Check cooldown before processing command
             if await check_cooldown(ctx):
-                await self.invoke(ctx)
+                # Run the command on its own so long commands don't hold up later stages
+                task = asyncio.create_task(self.invoke(ctx))
+                # The loop only keeps weak references to tasks
+                self.command_tasks.add(task)
+                task.add_done_callback(self.command_tasks.discard)
+
+    async def close(self):
+        self.guild_settings.stop()
+        self.mod_timers.stop()
+        # Write pending bank and cog changes before shutting down
+        await self.bank_store.close()
+        for cog in list(self.cogs.values()):
+            if hasattr(cog, "flush_pending"):
+                try:
+                    await cog.flush_pending()
+                except Exception as e:
+                    print(f"Error flushing {cog.qualified_name}: {e}")
+        await self.http_client.close()
+        self.render_service.close()
+        await super().close()
 
 client = CustomBot(command_prefix=get_prefix, intents=intents)
 
@@ -121,14 +160,8 @@ async def change_prefix(ctx, new_prefix: str):
         await ctx.send(embed=embed)
         return
 
-    # Load current prefixes
-    prefixes = load_prefix_config()
-    # Update prefix for this guild
-    prefixes[str(ctx.guild.id)] = new_prefix
-    
-    # Save to file
-    with open('data/prefix.json', 'w') as f:
-        json.dump(prefixes, f, indent=4)
+    # Update prefix for this guild, saved to file and cached
+    client.guild_settings.set_prefix(ctx.guild.id, new_prefix)
     
     embed = discord.Embed(
         title="Prefix Updated",
@@ -137,6 +170,49 @@ async def change_prefix(ctx, new_prefix: str):
     )
     await ctx.send(embed=embed)
 
+@client.command(name='pipelinestats')
+@commands.has_permissions(administrator=True)
+async def pipeline_stats(ctx):
+    embed = discord.Embed(
+        title="Message Pipeline",
+        description="Latency per message stage since startup",
+        color=discord.Color.blue()
+    )
+
+    for order, name, handler in client.pipeline.stages:
+        stats = client.pipeline.stats[name]
+        embed.add_field(
+            name=f"{order}. {name}",
+            value=f"Calls: **{stats.calls:,}**\n"
+                  f"Avg: **{stats.avg_time * 1000:.2f}ms** | Max: **{stats.max_time * 1000:.2f}ms**\n"
+                  f"Stopped: **{stats.stops:,}** | Errors: **{stats.errors:,}**",
+            inline=False
+        )
+
+    await ctx.send(embed=embed)
+
+@client.command(name='renderstats')
+@commands.has_permissions(administrator=True)
+async def render_stats(ctx):
+    service = client.render_service
+    embed = discord.Embed(
+        title="Render Service",
+        description=f"Queue: **{service.pending}** / {service.max_queue} | "
+                    f"Workers: **{service.max_workers}** | Rejected: **{service.rejected:,}**",
+        color=discord.Color.blue()
+    )
+
+    for name, stats in service.stats.items():
+        embed.add_field(
+            name=name,
+            value=f"Renders: **{stats.completed:,}**\n"
+                  f"Avg: **{stats.avg_time * 1000:.0f}ms** | Max: **{stats.max_time * 1000:.0f}ms**\n"
+                  f"Timeouts: **{stats.timeouts:,}** | Errors: **{stats.failed:,}**",
+            inline=False
+        )
+
+    await ctx.send(embed=embed)
+
 @client.event
 async def on_command_error(ctx, error):
     # Check if the error was already handled by a cog
@@ -165,6 +241,9 @@ async def on_command_error(ctx, error):
         await ctx.send(embed=embed)
 
 async def setup_hook():
+    client.bank_store.start()
+    client.guild_settings.start()
+    client.mod_timers.start()
     try:
         await client.add_cog(EconomyCog(client))
         await client.add_cog(GamblingCog(client))
@@ -0,0 +1,348 @@
+import asyncio
+import heapq
+import json
+import os
+from collections import defaultdict
+
+from messagesegment import MessageSegment, tokenize, write_segment
+
+
+class MessageIndex:
+    """Word index of one guild's messages, used by cclear.
+
+    Filled once by a history backfill and then kept current from message
+    create, edit and delete events. The backfill records a checkpoint per
+    channel (oldest message id scanned, or done), so an interrupted
+    backfill resumes where it stopped.
+
+    Most messages live in a memory-mapped segment file (<guild>.seg, see
+    messagesegment.py) that is never parsed as a whole. Changes since the
+    segment was written are kept in memory: new and edited messages with
+    their own word index, plus the ids of segment messages that were
+    deleted or replaced. They are appended to a journal file, and once the
+    journal outgrows compact_every entries (or a fifth of the index) the
+    segment and the changes are merged into a new segment in a worker
+    thread. A restart maps the segment and replays the journal.
+    """
+
+    def __init__(self, directory, guild_id, compact_every=50000):
+        self.guild_id = guild_id
+        self.segment_path = os.path.join(directory, f"{guild_id}.seg")
+        self.snapshot_path = os.path.join(directory, f"{guild_id}.json")  # Old JSON snapshot
+        self.journal_path = os.path.join(directory, f"{guild_id}.journal")
+        self.compact_every = compact_every
+        self.segment = None
+        self.messages = {}  # message_id -> [channel_id, author_id, timestamp, content], newer than the segment
+        self.words = defaultdict(set)  # word -> {message_id} for self.messages
+        self.removed = set()  # segment message ids that were deleted or replaced
+        self.backfilled = False
+        self.checkpoints = {}  # channel_id -> [oldest scanned message_id, done]
+        self.backfill_lock = asyncio.Lock()
+        self.deleted = None  # ids deleted while a backfill runs, so it doesn't re-add them
+        self.pending = []  # journal entries not written yet
+        self.journal_entries = 0
+        self.needs_compaction = False
+        self.flush_lock = asyncio.Lock()
+
+    def __len__(self):
+        base = len(self.segment) - len(self.removed) if self.segment else 0
+        return base + len(self.messages)
+
+    def load(self):
+        # Runs in a worker thread before the index is used
+        try:
+            if os.path.exists(self.segment_path):
+                self.segment = MessageSegment(self.segment_path)
+                self.load_meta(self.segment.meta)
+            elif os.path.exists(self.snapshot_path):
+                # Written by an older version, converted by the next flush
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                self.load_meta(snapshot)
+                for message_id, *record in snapshot.get("messages", []):
+                    self.insert(message_id, record)
+                self.needs_compaction = True
+        except (OSError, ValueError) as e:
+            print(f"Error reading message index for guild {self.guild_id}, rebuilding it: {e}")
+            self.reset()
+            return
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Torn last line from a crash
+                        break
+                    self.journal_entries += 1
+
+    def load_meta(self, meta):
+        self.backfilled = meta.get("backfilled", False)
+        for channel_id, before_id, done in meta.get("checkpoints", []):
+            self.checkpoints[channel_id] = [before_id, done]
+
+    def apply(self, entry):
+        op = entry[0]
+        if op == "add":
+            self.insert(entry[1], entry[2:])
+        elif op == "edit":
+            self.update(entry[1], entry[2])
+        elif op == "delete":
+            self.discard(entry[1])
+        elif op == "checkpoint":
+            self.checkpoints[entry[1]] = [entry[2], entry[3]]
+        elif op == "reset":
+            self.clear()
+        elif op == "backfilled":
+            self.backfilled = True
+
+    def journal(self, *entry):
+        self.pending.append(list(entry))
+
+    def in_segment(self, message_id):
+        return (self.segment is not None and message_id not in self.removed
+                and self.segment.find(message_id) is not None)
+
+    def contains(self, message_id):
+        return message_id in self.messages or self.in_segment(message_id)
+
+    def record(self, message_id):
+        record = self.messages.get(message_id)
+        if record is None and self.in_segment(message_id):
+            record = self.segment.record(self.segment.find(message_id))
+        return record
+
+    def insert(self, message_id, record):
+        self.discard(message_id)
+        self.messages[message_id] = list(record)
+        for word in tokenize(record[3]):
+            self.words[word].add(message_id)
+
+    def update(self, message_id, content):
+        record = self.record(message_id)
+        if record is None:
+            return False
+        self.insert(message_id, record[:3] + [content])
+        return True
+
+    def discard(self, message_id):
+        record = self.messages.pop(message_id, None)
+        if record is not None:
+            for word in tokenize(record[3]):
+                ids = self.words.get(word)
+                if ids is not None:
+                    ids.discard(message_id)
+                    if not ids:
+                        del self.words[word]
+            return True
+        if self.in_segment(message_id):
+            self.removed.add(message_id)
+            return True
+        return False
+
+    def clear(self):
+        # The segment file stays until the next compaction replaces it
+        self.segment = None
+        self.messages.clear()
+        self.words.clear()
+        self.removed.clear()
+        self.checkpoints.clear()
+        self.backfilled = False
+
+    def add(self, message_id, channel_id, author_id, timestamp, content):
+        # Live message
+        record = [channel_id, author_id, timestamp, content]
+        self.insert(message_id, record)
+        self.journal("add", message_id, *record)
+
+    def add_backfilled(self, message_id, channel_id, author_id, timestamp, content):
+        # Message from history, live events already seen for it are newer
+        if self.contains(message_id) or (self.deleted and message_id in self.deleted):
+            return False
+        self.add(message_id, channel_id, author_id, timestamp, content)
+        return True
+
+    def edit(self, message_id, content):
+        if self.update(message_id, content):
+            self.journal("edit", message_id, content)
+
+    def delete(self, message_id):
+        if self.deleted is not None:
+            self.deleted.add(message_id)
+        if self.discard(message_id):
+            self.journal("delete", message_id)
+
+    def reset(self):
+        self.clear()
+        self.journal("reset")
+
+    def checkpoint(self, channel_id, before_id, done=False):
+        # Journaled after the messages it covers, so a resume never skips any
+        self.checkpoints[channel_id] = [before_id, done]
+        self.journal("checkpoint", channel_id, before_id, done)
+
+    def begin_backfill(self):
+        self.deleted = set()
+
+    def end_backfill(self, complete=True):
+        self.deleted = None
+        if complete:
+            self.backfilled = True
+            self.journal("backfilled")
+
+    def search(self, text, channel_id=None, author_id=None):
+        # (message_id, channel_id) oldest first for messages containing every
+        # word of text, and the text itself as a substring
+        text = text.lower()
+        search_words = text.split()
+        if not search_words:
+            return []
+
+        matches = []
+        candidates = set(self.words.get(search_words[0], ()))
+        for word in search_words[1:]:
+            candidates &= self.words.get(word, set())
+        for message_id in candidates:
+            record_channel, record_author, _, content = self.messages[message_id]
+            if channel_id is not None and record_channel != channel_id:
+                continue
+            if author_id is not None and record_author != author_id:
+                continue
+            if text in content.lower():
+                matches.append((message_id, record_channel))
+
+        segment = self.segment
+        if segment is not None:
+            # Only the postings of the search words are read from the segment
+            for doc in segment.candidates(search_words):
+                message_id = segment.ids[doc]
+                if message_id in self.removed:
+                    continue
+                if channel_id is not None and segment.channels[doc] != channel_id:
+                    continue
+                if author_id is not None and segment.authors[doc] != author_id:
+                    continue
+                if text in segment.text(doc).lower():
+                    matches.append((message_id, segment.channels[doc]))
+
+        matches.sort()
+        return matches
+
+    def meta(self):
+        return {
+            "backfilled": self.backfilled,
+            "checkpoints": [[channel_id, *checkpoint] for channel_id, checkpoint in self.checkpoints.items()],
+        }
+
+    def write_journal(self, entries):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def write_compacted(self, segment, removed, messages, meta):
+        # Merge the old segment (minus removed ids) with the newer messages,
+        # both already sorted by id
+        base = (record for record in segment.records() if record[0] not in removed) if segment else ()
+        newer = ((message_id, *record) for message_id, record in sorted(messages.items()))
+        write_segment(self.segment_path, heapq.merge(base, newer), meta)
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+        # Everything in the journal is part of the segment now
+        open(self.journal_path, 'w').close()
+
+    async def flush(self, compact=False):
+        async with self.flush_lock:
+            if not self.pending and not compact and not self.needs_compaction:
+                return
+            entries = self.pending
+            self.pending = []
+            self.journal_entries += len(entries)
+            if not (compact or self.needs_compaction
+                    or self.journal_entries >= max(self.compact_every, len(self) // 5)):
+                await asyncio.to_thread(self.write_journal, entries)
+                return
+
+            old_segment = self.segment
+            await asyncio.to_thread(self.write_compacted, old_segment, set(self.removed),
+                                    dict(self.messages), self.meta())
+            # Changes made while the segment was written are still pending,
+            # they become the new in-memory changes on top of the new segment
+            self.segment = MessageSegment(self.segment_path)
+            self.messages = {}
+            self.words = defaultdict(set)
+            self.removed = set()
+            for entry in self.pending:
+                self.apply(entry)
+            self.journal_entries = 0
+            self.needs_compaction = False
+            if old_segment is not None:
+                old_segment.close()
+
+
+class MessageIndexStore:
+    """Per-guild MessageIndex objects under one directory.
+
+    Indexes are created on first use (cclear) and loaded lazily; live events
+    for guilds that never used cclear are ignored. Pending journal entries
+    are written every flush_interval seconds and by flush() on shutdown.
+    """
+
+    def __init__(self, directory='data/message_index', flush_interval=5):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.indexes = {}
+        self.lock = asyncio.Lock()
+        self.flush_task = None
+        os.makedirs(directory, exist_ok=True)
+        # Guilds with an index on disk, live events keep these current
+        self.tracked = {
+            int(name.split('.')[0]) for name in os.listdir(directory)
+            if name.split('.')[0].isdigit()
+        }
+
+    async def get(self, guild_id, create=True):
+        index = self.indexes.get(guild_id)
+        if index is not None:
+            return index
+        if not create and guild_id not in self.tracked:
+            return None
+        async with self.lock:
+            index = self.indexes.get(guild_id)
+            if index is None:
+                index = MessageIndex(self.directory, guild_id)
+                await asyncio.to_thread(index.load)
+                self.indexes[guild_id] = index
+                self.tracked.add(guild_id)
+        return index
+
+    async def tracked_index(self, guild_id):
+        # Index for a live event, None for guilds without an index
+        if guild_id is None or guild_id not in self.tracked:
+            return None
+        return await self.get(guild_id, create=False)
+
+    async def flush(self):
+        for index in list(self.indexes.values()):
+            try:
+                await index.flush()
+            except Exception as e:
+                print(f"Error saving message index for guild {index.guild_id}: {e}")
+
+    async def flush_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error in message index flush loop: {e}")
+
+    def start(self):
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush_loop())
+
+    def stop(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
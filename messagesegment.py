@@ -0,0 +1,277 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+MAGIC = b'LMSG'
+VERSION = 1
+# magic, version, little endian flag, doc count, term count, 12 section offsets
+HEADER = struct.Struct('<4sHHQQ12Q')
+
+# Section order in the file, each one starts 8-byte aligned
+SECTIONS = ('content', 'ids', 'channels', 'authors', 'timestamps', 'content_offsets',
+            'term_heap', 'term_offsets', 'postings', 'posting_offsets', 'meta')
+
+
+def tokenize(content):
+    return set(content.lower().split())
+
+
+def encode_postings(docs, out):
+    # Ascending doc numbers as varint gaps
+    previous = 0
+    for doc in docs:
+        gap = doc - previous
+        previous = doc
+        while gap >= 0x80:
+            out.append((gap & 0x7F) | 0x80)
+            gap >>= 7
+        out.append(gap)
+
+
+def decode_postings(data):
+    docs = []
+    value = shift = previous = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            previous += value
+            docs.append(previous)
+            value = shift = 0
+    return docs
+
+
+def write_segment(path, docs, meta):
+    """Write (message_id, channel_id, author_id, timestamp, content) tuples,
+    sorted by message_id, to a segment file at path.
+
+    Contents are streamed into a string heap, the other fields go into
+    fixed-width columns, and every word gets a delta-encoded posting list
+    of doc numbers. The file is swapped in atomically.
+    """
+    ids, channels, authors = array('Q'), array('Q'), array('Q')
+    timestamps, content_offsets = array('I'), array('Q')
+    terms = {}  # word -> array of doc numbers
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(b'\0' * HEADER.size)
+        offsets = {'content': f.tell()}
+        position = 0
+        for doc, (message_id, channel_id, author_id, timestamp, content) in enumerate(docs):
+            ids.append(message_id)
+            channels.append(channel_id)
+            authors.append(author_id)
+            timestamps.append(max(0, int(timestamp)))
+            content_offsets.append(position)
+            data = content.encode('utf-8', 'surrogatepass')
+            f.write(data)
+            position += len(data)
+            for word in tokenize(content):
+                postings = terms.get(word)
+                if postings is None:
+                    postings = terms[word] = array('I')
+                postings.append(doc)
+        content_offsets.append(position)
+
+        term_heap, term_offsets = bytearray(), array('Q')
+        postings, posting_offsets = bytearray(), array('Q')
+        for word in sorted(terms, key=lambda word: word.encode('utf-8', 'surrogatepass')):
+            term_offsets.append(len(term_heap))
+            term_heap += word.encode('utf-8', 'surrogatepass')
+            posting_offsets.append(len(postings))
+            encode_postings(terms[word], postings)
+        term_offsets.append(len(term_heap))
+        posting_offsets.append(len(postings))
+
+        def section(name, data):
+            f.write(b'\0' * (-f.tell() % 8))
+            offsets[name] = f.tell()
+            f.write(data)
+
+        section('ids', ids.tobytes())
+        section('channels', channels.tobytes())
+        section('authors', authors.tobytes())
+        section('timestamps', timestamps.tobytes())
+        section('content_offsets', content_offsets.tobytes())
+        section('term_heap', term_heap)
+        section('term_offsets', term_offsets.tobytes())
+        section('postings', postings)
+        section('posting_offsets', posting_offsets.tobytes())
+        section('meta', json.dumps(meta).encode('utf-8'))
+        end = f.tell()
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == 'little', len(ids), len(terms),
+                            *(offsets[name] for name in SECTIONS), end))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class MessageSegment:
+    """Read-only, memory-mapped segment file written by write_segment.
+
+    Nothing is parsed up front: columns are memoryviews over the mapping,
+    words are found by binary search in the sorted term dictionary, and a
+    search decodes only the posting lists of its own words.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, little_endian, self.n_docs, self.n_terms, *offsets = HEADER.unpack_from(self.mm)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a message segment")
+            if bool(little_endian) != (sys.byteorder == 'little'):
+                raise ValueError(f"{path} was written with a different byte order")
+            bounds = dict(zip(SECTIONS + ('end',), offsets))
+            view = memoryview(self.mm)
+
+            def section(name, format=None):
+                start = bounds[name]
+                end = bounds[SECTIONS[SECTIONS.index(name) + 1]] if name != 'meta' else bounds['end']
+                data = view[start:end]
+                if format is None:
+                    return data
+                # Drop the alignment padding before the next section
+                size = struct.calcsize(format)
+                return data[:len(data) // size * size].cast(format)
+
+            self.views = [view]
+            self.content = section('content')
+            self.ids = section('ids', 'Q')[:self.n_docs]
+            self.channels = section('channels', 'Q')[:self.n_docs]
+            self.authors = section('authors', 'Q')[:self.n_docs]
+            self.timestamps = section('timestamps', 'I')[:self.n_docs]
+            self.content_offsets = section('content_offsets', 'Q')[:self.n_docs + 1]
+            self.term_heap = section('term_heap')
+            self.term_offsets = section('term_offsets', 'Q')[:self.n_terms + 1]
+            self.postings = section('postings')
+            self.posting_offsets = section('posting_offsets', 'Q')[:self.n_terms + 1]
+            self.views += [self.content, self.ids, self.channels, self.authors, self.timestamps,
+                           self.content_offsets, self.term_heap, self.term_offsets,
+                           self.postings, self.posting_offsets]
+            self.meta = json.loads(bytes(section('meta')))
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.n_docs
+
+    def find(self, message_id):
+        # Doc number of a message id, or None
+        doc = bisect.bisect_left(self.ids, message_id)
+        if doc < self.n_docs and self.ids[doc] == message_id:
+            return doc
+        return None
+
+    def text(self, doc):
+        return bytes(self.content[self.content_offsets[doc]:self.content_offsets[doc + 1]]).decode('utf-8', 'surrogatepass')
+
+    def record(self, doc):
+        # [channel_id, author_id, timestamp, content]
+        return [self.channels[doc], self.authors[doc], self.timestamps[doc], self.text(doc)]
+
+    def records(self):
+        # (message_id, channel_id, author_id, timestamp, content) for every doc, in id order
+        for doc in range(self.n_docs):
+            yield (self.ids[doc], *self.record(doc))
+
+    def term(self, word):
+        # Posting byte range of a word, or None
+        key = word.encode('utf-8', 'surrogatepass')
+        low, high = 0, self.n_terms
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(self.term_heap[self.term_offsets[middle]:self.term_offsets[middle + 1]]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.n_terms and bytes(self.term_heap[self.term_offsets[low]:self.term_offsets[low + 1]]) == key:
+            return self.posting_offsets[low], self.posting_offsets[low + 1]
+        return None
+
+    def candidates(self, words):
+        # Doc numbers containing every word, shortest posting list first
+        ranges = []
+        for word in set(words):
+            posting_range = self.term(word)
+            if posting_range is None:
+                return []
+            ranges.append(posting_range)
+        ranges.sort(key=lambda posting_range: posting_range[1] - posting_range[0])
+
+        docs = None
+        for start, end in ranges:
+            found = decode_postings(self.postings[start:end])
+            docs = set(found) if docs is None else docs.intersection(found)
+            if not docs:
+                return []
+        return sorted(docs)
+
+    def close(self):
+        views = getattr(self, 'views', [])
+        for view in reversed(views):
+            view.release()
+        self.views = []
+        try:
+            self.mm.close()
+        except BufferError:
+            # A view is still referenced somewhere, the mapping closes with it
+            pass
+
+
+if __name__ == "__main__":
+    # Benchmark: python messagesegment.py [messages]
+    # Compares loading and searching a JSON cache with the segment format.
+    import random
+    import tempfile
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    vocabulary = [f"word{i}" for i in range(20000)]
+    rng = random.Random(1)
+    docs = [(10**17 + i, rng.randrange(30), rng.randrange(500), 1700000000 + i,
+             " ".join(rng.choices(vocabulary, k=12)) + (" needle" if i % 1000 == 0 else ""))
+            for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'cache.json')
+        segment_path = os.path.join(directory, 'cache.seg')
+        with open(json_path, 'w') as f:
+            json.dump([list(doc) for doc in docs], f, indent=2)
+
+        start = time.perf_counter()
+        write_segment(segment_path, docs, {})
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(json_path) as f:
+            loaded = json.load(f)
+        index = {}
+        for i, doc in enumerate(loaded):
+            for word in tokenize(doc[4]):
+                index.setdefault(word, []).append(i)
+        json_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        segment = MessageSegment(segment_path)
+        open_time = time.perf_counter() - start
+        start = time.perf_counter()
+        found = [segment.ids[doc] for doc in segment.candidates(["needle"])]
+        search_time = time.perf_counter() - start
+
+        print(f"{count} messages")
+        print(f"  json cache  {os.path.getsize(json_path) / 2**20:7.1f} MiB, load + index {json_time * 1000:8.1f} ms")
+        print(f"  segment     {os.path.getsize(segment_path) / 2**20:7.1f} MiB, write {write_time * 1000:8.1f} ms, "
+              f"open {open_time * 1000:.2f} ms, search {search_time * 1000:.2f} ms ({len(found)} hits)")
+        segment.close()
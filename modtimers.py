@@ -0,0 +1,114 @@
+import time
+
+import discord
+
+from scheduler import JobScheduler
+
+
+class ModerationTimers:
+    """Persistent expiry timers for moderation actions (mutes, jails, bans...).
+
+    Commands apply the punishment, call schedule() and return right away. The
+    undo step is a job in data/mod_timers.json run by one JobScheduler task,
+    so timers survive restarts and anything that expired while the bot was
+    offline is undone right after startup.
+
+    Every timer does one action when it expires:
+      remove_role  take role_id away from the member (unmute, unjail...)
+      add_role     give role_id back (end of a temporary ungrant/unjail)
+      unban        lift a ban
+    and then posts its notice embed (title, description, color) to channel_id.
+    """
+
+    def __init__(self, client, path='data/mod_timers.json'):
+        self.client = client
+        self.scheduler = JobScheduler(path, self.expire, index_field='guild_id')
+        self.expired = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.scheduler)
+
+    async def schedule(self, action, guild_id, user_id, seconds, role_id=None,
+                       channel_id=None, notice=None, reason=None):
+        # A newer timer for the same action and role (or ban, role_id None)
+        # replaces the old one. Timers of the other action stay, so the expiry
+        # of "grant 1h" still runs after "ungrant 10m" has restored the role.
+        await self.cancel(guild_id, user_id, role_id=role_id, action=action)
+        return await self.scheduler.add(
+            time.time() + seconds,
+            action=action,
+            guild_id=guild_id,
+            user_id=user_id,
+            role_id=role_id,
+            channel_id=channel_id,
+            notice=notice,
+            reason=reason,
+        )
+
+    async def cancel(self, guild_id, user_id, **fields):
+        # Drop pending timers of a member, e.g. after a manual unmute
+        return await self.scheduler.cancel_where(guild_id=guild_id, user_id=user_id, **fields)
+
+    async def pending(self, guild_id):
+        return await self.scheduler.jobs_for(guild_id)
+
+    async def expire(self, job):
+        await self.client.wait_until_ready()
+        guild = self.client.get_guild(job["guild_id"])
+        if guild is None:
+            self.skipped += 1
+            return
+
+        action = job["action"]
+        if action == "unban":
+            try:
+                await guild.unban(discord.Object(id=job["user_id"]), reason=job.get("reason"))
+            except discord.NotFound:
+                # Already unbanned
+                self.skipped += 1
+                return
+        else:
+            role = guild.get_role(job["role_id"])
+            if role is None:
+                self.skipped += 1
+                return
+            member = guild.get_member(job["user_id"])
+            if member is None:
+                try:
+                    member = await guild.fetch_member(job["user_id"])
+                except discord.NotFound:
+                    # Member left the server
+                    self.skipped += 1
+                    return
+            if action == "remove_role":
+                if role not in member.roles:
+                    self.skipped += 1
+                    return
+                await member.remove_roles(role, reason=job.get("reason"))
+            elif action == "add_role":
+                if role in member.roles:
+                    self.skipped += 1
+                    return
+                await member.add_roles(role, reason=job.get("reason"))
+            else:
+                raise ValueError(f"Unknown moderation timer action: {action}")
+
+        self.expired += 1
+        notice = job.get("notice")
+        channel = self.client.get_channel(job.get("channel_id")) if job.get("channel_id") else None
+        if notice and channel:
+            embed = discord.Embed(
+                title=notice["title"],
+                description=notice["description"],
+                color=notice.get("color", discord.Color.green().value),
+            )
+            if notice.get("timestamp"):
+                embed.timestamp = discord.utils.utcnow()
+            await channel.send(embed=embed)
+
+    def start(self):
+        self.scheduler.start()
+
+    def stop(self):
+        self.scheduler.stop()
@@ -0,0 +1,131 @@
+import asyncio
+import heapq
+import time
+
+
+class NowPlayingPoller:
+    """Polls Last.fm users' now-playing state on an adaptive schedule.
+
+    Users who are playing something are polled every active_interval seconds,
+    users who just stopped after recent_interval, and idle users back off
+    from idle_interval up to max_idle_interval. The latest state is kept in
+    snapshot (username -> {'username', 'song', 'artist', 'updated'}) for
+    users who are currently playing.
+
+    fetch(username) returns the now-playing dict or None and may raise. Every
+    poll waits on the given KeyedRateLimiter first.
+    """
+
+    def __init__(self, fetch, limiter, active_interval=30, recent_interval=60,
+                 idle_interval=120, max_idle_interval=900):
+        self.fetch = fetch
+        self.limiter = limiter
+        self.active_interval = active_interval
+        self.recent_interval = recent_interval
+        self.idle_interval = idle_interval
+        self.max_idle_interval = max_idle_interval
+
+        self.snapshot = {}
+        self.intervals = {}
+        # username -> next poll time; heap entries that disagree are stale
+        self.due = {}
+        self.heap = []
+        self.polled = set()
+        self.polls = 0
+        self.errors = 0
+
+    def __contains__(self, username):
+        return username in self.due
+
+    def add(self, username, delay=0):
+        if username in self.due:
+            return
+        self.schedule(username, delay)
+
+    def remove(self, username):
+        self.due.pop(username, None)
+        self.intervals.pop(username, None)
+        self.snapshot.pop(username, None)
+        self.polled.discard(username)
+
+    def sync(self, usernames):
+        # Track exactly these usernames, new ones are spread over the first minute
+        usernames = set(usernames)
+        for username in list(self.due):
+            if username not in usernames:
+                self.remove(username)
+        new_users = [username for username in usernames if username not in self.due]
+        for i, username in enumerate(new_users):
+            self.schedule(username, 60 * i / max(len(new_users), 1))
+
+    def schedule(self, username, delay):
+        due = time.monotonic() + delay
+        self.due[username] = due
+        heapq.heappush(self.heap, (due, username))
+
+    def record(self, username, now_playing):
+        # Store a poll result and work out when to look at this user again,
+        # results for users that aren't tracked (anymore) are ignored
+        if username not in self.due:
+            return None
+        was_playing = username in self.snapshot
+        self.polled.add(username)
+        if now_playing:
+            self.snapshot[username] = dict(now_playing, updated=time.time())
+            interval = self.active_interval
+        else:
+            self.snapshot.pop(username, None)
+            if was_playing:
+                interval = self.recent_interval
+            else:
+                previous = self.intervals.get(username, self.idle_interval // 2)
+                interval = min(max(previous * 2, self.idle_interval), self.max_idle_interval)
+        self.intervals[username] = interval
+        return interval
+
+    def is_warm(self, usernames):
+        # True once every one of these users has been polled at least once
+        return all(username in self.polled for username in usernames)
+
+    def playing(self, usernames):
+        return [self.snapshot[username] for username in usernames if username in self.snapshot]
+
+    async def poll(self, username):
+        await self.limiter.acquire("poll")
+        self.polls += 1
+        try:
+            now_playing = await self.fetch(username)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error polling now playing for {username}: {e}")
+            if username not in self.due:
+                return None
+            interval = min(self.intervals.get(username, self.idle_interval) * 2, self.max_idle_interval)
+            self.intervals[username] = interval
+            return interval
+        return self.record(username, now_playing)
+
+    async def run(self):
+        while True:
+            try:
+                # Drop heap entries of removed or rescheduled users
+                while self.heap and self.due.get(self.heap[0][1]) != self.heap[0][0]:
+                    heapq.heappop(self.heap)
+
+                now = time.monotonic()
+                if not self.heap or self.heap[0][0] > now:
+                    # Wake up at least every few seconds to pick up new users
+                    wait = self.heap[0][0] - now if self.heap else 5
+                    await asyncio.sleep(min(wait, 5))
+                    continue
+
+                due, username = heapq.heappop(self.heap)
+                interval = await self.poll(username)
+                # The user may have been removed or re-added while the request was running
+                if interval is not None and self.due.get(username) == due:
+                    self.schedule(username, interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in now playing poller: {e}")
+                await asyncio.sleep(5)
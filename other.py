@@ -8,20 +8,24 @@ import re
 import asyncio
 from typing import Optional, Tuple, Dict, List, Union
 import pytz
-import requests
 import io
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
+from render import QUOTE_FONTS, TYPING_TEST_FONTS, find_font, render_avatar_tile, render_quote, render_typing_test
 import traceback
 import json
 import collections
 import base64
+import hashlib
+from diskcache import DiskCache
+from scheduler import JobScheduler
+from ttlcache import TTLCache
+from typingpool import TypingTestPool
 
 class OtherCog(commands.Cog):
     def __init__(self, client):
         self.client = client
         self.afk_users = {}
-        self.reminder_tasks = {} 
+        # Pending reminders, persisted in data/reminders.json
+        self.reminders = JobScheduler('data/reminders.json', self.send_reminder)
         self.google_api_key = os.getenv("GOOGLE_API_KEY", "")
         self.google_cse_id = os.getenv("GOOGLE_CSE_ID", "")
         self.image_search_cache = {}  
@@ -187,8 +191,21 @@ class OtherCog(commands.Cog):
         os.makedirs('data/fonts', exist_ok=True)
         
         # Font paths - we'll use default fonts if custom ones aren't available
+        # (a fallback font is downloaded in cog_load if none is found)
         self.font_path = self.get_font_path()
         print(f"Font path: {self.font_path}")
+        # Darkened quote backgrounds per avatar hash, and finished quote images
+        self.avatar_tile_cache = DiskCache('data/cache/avatar_tiles', max_bytes=100 * 1024 * 1024, extension='.png')
+        self.quote_cache = DiskCache('data/cache/quotes', max_bytes=200 * 1024 * 1024, extension='.png')
+        # Ready-made typing tests for the common word counts
+        self.typing_pool = TypingTestPool(self.pick_typing_words, self.render_typing_words)
+        
+        # Geocoding results barely change, forecasts are cached per rounded coordinate
+        self.geocode_cache = TTLCache(maxsize=2048)
+        self.geocode_ttl = 7 * 24 * 60 * 60
+        self.forecast_cache = TTLCache(maxsize=512)
+        self.forecast_ttl = 15 * 60
+        self.max_weather_locations = 10
         
         self.weather_codes = {
             # Clear
@@ -246,6 +263,22 @@ class OtherCog(commands.Cog):
             # Default
             -1: "🌡️"
         }
+
+    async def cog_load(self):
+        self.client.pipeline.register("afk_typing", self.afk_typing_stage, order=30)
+        if not self.font_path:
+            self.font_path = await self.download_font()
+            print(f"Font path: {self.font_path}")
+        # Probe the font candidates once instead of on every render
+        self.quote_font_path = find_font(QUOTE_FONTS, self.font_path)
+        self.typing_font_path = find_font(TYPING_TEST_FONTS, self.font_path)
+        self.typing_pool.start()
+        self.reminders.start()
+
+    def cog_unload(self):
+        self.client.pipeline.unregister("afk_typing")
+        self.typing_pool.stop()
+        self.reminders.stop()
     
     def parse_time(self, time_str: str, reason: str) -> Tuple[Optional[datetime], str]:
         now = datetime.now()
@@ -329,23 +362,18 @@ class OtherCog(commands.Cog):
                 
         return None, reason
         
-    async def send_reminder(self, ctx, user_id: int, channel_id: int, remind_time: datetime, reason: str):
-        try:
-            await asyncio.sleep((remind_time - datetime.now()).total_seconds())
-            channel = self.client.get_channel(channel_id)
-            if channel:
-                user = await self.client.fetch_user(user_id)
-                embed = discord.Embed(
-                    title="Reminder",
-                    description=f"{user.mention}, here's your reminder: {reason}",
-                    color=0x00FF00
-                )
-                await channel.send(embed=embed)
-        except asyncio.CancelledError:
-            pass
-        finally:
-            if user_id in self.reminder_tasks:
-                self.reminder_tasks[user_id] = [task for task in self.reminder_tasks[user_id] if not task.done()]
+    async def send_reminder(self, reminder: Dict):
+        # Called by the reminder scheduler once the reminder is due
+        await self.client.wait_until_ready()
+        channel = self.client.get_channel(reminder["channel_id"])
+        if channel:
+            user = await self.client.fetch_user(reminder["user_id"])
+            embed = discord.Embed(
+                title="Reminder",
+                description=f"{user.mention}, here's your reminder: {reminder['reason']}",
+                color=0x00FF00
+            )
+            await channel.send(embed=embed)
                 
     @commands.command(aliases=['rm'])
     async def remindme(self, ctx, time_str: str, *, reason: str = "No reason provided"):
@@ -372,14 +400,13 @@ class OtherCog(commands.Cog):
             await ctx.send("Reminders cannot be set more than a year in the future.")
             return
             
-        # Create and store the reminder task
-        if ctx.author.id not in self.reminder_tasks:
-            self.reminder_tasks[ctx.author.id] = []
-            
-        reminder_task = asyncio.create_task(
-            self.send_reminder(ctx, ctx.author.id, ctx.channel.id, remind_time, cleaned_reason)
+        # Store the reminder, the scheduler sends it when it's due
+        await self.reminders.add(
+            remind_time.timestamp(),
+            user_id=ctx.author.id,
+            channel_id=ctx.channel.id,
+            reason=cleaned_reason
         )
-        self.reminder_tasks[ctx.author.id].append(reminder_task)
         
         # Calculate time difference for display
         time_diff = remind_time - datetime.now()
@@ -419,10 +446,8 @@ class OtherCog(commands.Cog):
         )
         await ctx.send(embed=embed)
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    async def afk_typing_stage(self, mctx):
+        message = mctx.message
 
         # Check if the message author was AFK and is now back
         if message.author.id in self.afk_users:
@@ -763,19 +788,8 @@ class OtherCog(commands.Cog):
     
     @commands.command(aliases=['list', 'reminders'])
     async def remindme_list(self, ctx):
-        if ctx.author.id not in self.reminder_tasks or not self.reminder_tasks[ctx.author.id]:
-            embed = discord.Embed(
-                title="Your Reminders",
-                description="You don't have any active reminders.",
-                color=0x808080
-            )
-            await ctx.send(embed=embed)
-            return
-
-        # Clean up completed tasks first
-        self.reminder_tasks[ctx.author.id] = [task for task in self.reminder_tasks[ctx.author.id] if not task.done()]
-        
-        if not self.reminder_tasks[ctx.author.id]:
+        pending = await self.reminders.jobs_for(ctx.author.id)
+        if not pending:
             embed = discord.Embed(
                 title="Your Reminders",
                 description="You don't have any active reminders.",
@@ -784,43 +798,11 @@ class OtherCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Get reminder details from task names
-        reminders = []
-        now = datetime.now()
-        
-        for task in self.reminder_tasks[ctx.author.id]:
-            # Extract reminder time and reason from the task's internal data
-            # The send_reminder coroutine contains these as arguments
-            coro = task.get_coro()
-            frame = coro.cr_frame
-            remind_time = frame.f_locals.get('remind_time')
-            reason = frame.f_locals.get('reason')
-            
-            if remind_time and reason:
-                time_diff = remind_time - now
-                days = time_diff.days
-                hours, remainder = divmod(time_diff.seconds, 3600)
-                minutes, seconds = divmod(remainder, 60)
-                
-                time_parts = []
-                if days > 0:
-                    time_parts.append(f"{days} days")
-                if hours > 0:
-                    time_parts.append(f"{hours} hours")
-                if minutes > 0:
-                    time_parts.append(f"{minutes} minutes")
-                if seconds > 0 and not (days or hours or minutes):
-                    time_parts.append(f"{seconds} seconds")
-                
-                time_until = ", ".join(time_parts)
-                reminders.append({
-                    'time': remind_time,
-                    'reason': reason,
-                    'time_until': time_until
-                })
-        
-        # Sort reminders by time
-        reminders.sort(key=lambda x: x['time'])
+        # Already sorted by time, an embed holds at most 25 fields
+        reminders = [
+            {'time': datetime.fromtimestamp(reminder['due']), 'reason': reminder['reason']}
+            for reminder in pending[:25]
+        ]
         
         # Create embed with reminder list
         embed = discord.Embed(
@@ -854,191 +836,58 @@ class OtherCog(commands.Cog):
                 if os.path.exists(font):
                     return font
             
-            # If no system font found, download a free font
-            try:
-                font_url = "https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Regular.ttf"
-                response = requests.get(font_url)
-                if response.status_code == 200:
-                    os.makedirs(os.path.dirname(font_path), exist_ok=True)
-                    with open(font_path, 'wb') as f:
-                        f.write(response.content)
-                    return font_path
-            except Exception as e:
-                print(f"Error downloading font: {e}")
-            
             return None
+
+        return font_path
+
+    async def download_font(self):
+        # If no system font found, download a free font
+        font_path = 'data/fonts/arial.ttf'
+        try:
+            font_url = "https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Regular.ttf"
+            response = await self.client.http_client.get(font_url, timeout=30)
+            if response.status_code == 200:
+                os.makedirs(os.path.dirname(font_path), exist_ok=True)
+                with open(font_path, 'wb') as f:
+                    f.write(response.content)
+                return font_path
+        except Exception as e:
+            print(f"Error downloading font: {e}")
+        
+        return None
     
-    async def create_quote_image(self, avatar_url, message_content, username):
+    async def get_avatar_tile(self, avatar_url, avatar_key):
+        # Each avatar is downloaded, decoded and resized once per avatar hash
+        tile = await self.avatar_tile_cache.get(avatar_key) if avatar_key else None
+        if tile is None:
+            response = await self.client.http_client.get(avatar_url)
+            response.raise_for_status()
+            tile = await self.client.render_service.render(render_avatar_tile, response.content)
+            if avatar_key:
+                await self.avatar_tile_cache.set(avatar_key, tile)
+        return tile
+
+    async def create_quote_image(self, avatar_url, message_content, username, avatar_key=None, message_id=None):
         try:
-            # Download the user's avatar
-            response = requests.get(avatar_url)
-            avatar_image = Image.open(io.BytesIO(response.content))
-            
-            size = 1000
-            
-            width, height = avatar_image.size
-            
-            if width > height:
-                # Image is wider than tall
-                new_width = int(width * size / height)
-                new_height = size
-                left_crop = (new_width - size) // 2
-                top_crop = 0
-            else:
-                # Image is taller than wide
-                new_width = size
-                new_height = int(height * size / width)
-                left_crop = 0
-                top_crop = (new_height - size) // 2
-                
-            # Resize and crop to fill the square
-            avatar_image = avatar_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            avatar_image = avatar_image.crop((left_crop, top_crop, left_crop + size, top_crop + size))
-            
-            # Create the base image using the avatar
-            quote_img = avatar_image.copy()
-            
-            # Add a dark overlay to make text more readable
-            overlay = Image.new('RGBA', (size, size), (0, 0, 0, 230))  # Very dark overlay
-            quote_img = Image.alpha_composite(quote_img.convert('RGBA'), overlay)
-            
-            # Convert to RGB for final output
-            quote_img = quote_img.convert('RGB')
-            
-            # Create a blank image for the text with transparent background
-            text_img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(text_img)
-            
-            # Try to find a system font that works well
-            system_fonts = [
-                '/usr/share/fonts/TTF/DejaVuSans-Bold.ttf',  # Linux
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',  # Ubuntu
-                '/Library/Fonts/Arial Bold.ttf',  # macOS
-                'C:\\Windows\\Fonts\\arialbd.ttf',  # Windows
-                # Add fallbacks
-                '/usr/share/fonts/TTF/Arial.ttf',
-                '/usr/share/fonts/truetype/msttcorefonts/Arial.ttf',
-                self.font_path
-            ]
-            
-            font_path = None
-            for font in system_fonts:
-                if font and os.path.exists(font):
-                    font_path = font
-                    break
-            
-            # If no font found, we'll have to use default
-            if not font_path:
-                # Create a simple text overlay with basic text
-                draw.text((50, 50), f'"{message_content}"', fill=(255, 255, 255), font=ImageFont.load_default())
-                draw.text((50, 100), f"- {username}", fill=(255, 255, 255), font=ImageFont.load_default())
-            else:
-                # Custom line wrapping function that wraps after 3-5 words
-                def wrap_text(text, words_per_line=4):
-                    words = text.split()
-                    lines = []
-                    current_line = []
-                    
-                    for word in words:
-                        current_line.append(word)
-                        if len(current_line) >= words_per_line:
-                            lines.append(' '.join(current_line))
-                            current_line = []
-                    
-                    # Add any remaining words
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                    
-                    return '\n'.join(lines)
-                
-                # Wrap the text with 3-5 words per line
-                wrapped_text = wrap_text(message_content, 4)  # 4 words per line on average
-                
-                # Add quotation marks
-                quote_text = f'"{wrapped_text}"'
-                
-                # Calculate text size based on image dimensions
-                # We'll make the text take up about 80% of the image width
-                target_text_width = int(size * 0.8)
-                
-                # Start with a reasonable size and adjust
-                test_size = 20
-                max_size = 500
-                
-                # Find the largest font size that fits within our target width
-                font_size = test_size
-                for test_size in range(20, max_size, 10):
-                    try:
-                        test_font = ImageFont.truetype(font_path, test_size)
-                        # Check the width of the longest line
-                        longest_line = max(wrapped_text.split('\n'), key=len)
-                        bbox = draw.textbbox((0, 0), f'"{longest_line}"', font=test_font)
-                        if bbox[2] - bbox[0] > target_text_width:
-                            break
-                        font_size = test_size
-                    except Exception:
-                        break
-                
-                try:
-                    quote_font = ImageFont.truetype(font_path, font_size)
-                    username_font = ImageFont.truetype(font_path, font_size // 2)  # Username half the size
-                    
-                    # Get text dimensions
-                    quote_bbox = draw.textbbox((0, 0), quote_text, font=quote_font)
-                    quote_width = quote_bbox[2] - quote_bbox[0]
-                    quote_height = quote_bbox[3] - quote_bbox[1]
-                    
-                    # Center the text
-                    quote_x = (size - quote_width) // 2
-                    quote_y = (size - quote_height) // 2 - size // 8  # Slightly above center
-                    
-                    # Draw text with shadow for better visibility
-                    shadow_offset = max(3, font_size // 20)  # Scale shadow with font size
-                    
-                    # Draw shadow
-                    for dx, dy in [(shadow_offset, shadow_offset), (-shadow_offset, shadow_offset),
-                                  (shadow_offset, -shadow_offset), (-shadow_offset, -shadow_offset)]:
-                        draw.text((quote_x + dx, quote_y + dy), quote_text, fill=(0, 0, 0), font=quote_font)
-                    
-                    # Draw main text
-                    draw.text((quote_x, quote_y), quote_text, fill=(255, 255, 255), font=quote_font)
-                    
-                    # Add username
-                    username_text = f"- {username}"
-                    username_bbox = draw.textbbox((0, 0), username_text, font=username_font)
-                    username_width = username_bbox[2] - username_bbox[0]
-                    
-                    # Position username at bottom right
-                    username_x = size - username_width - (size // 20)
-                    username_y = size - (size // 5)
-                    
-                    # Draw username shadow
-                    for dx, dy in [(shadow_offset//2, shadow_offset//2), (-shadow_offset//2, shadow_offset//2),
-                                  (shadow_offset//2, -shadow_offset//2), (-shadow_offset//2, -shadow_offset//2)]:
-                        draw.text((username_x + dx, username_y + dy), username_text, fill=(0, 0, 0), font=username_font)
-                    
-                    # Draw username
-                    draw.text((username_x, username_y), username_text, fill=(255, 255, 255), font=username_font)
-                    
-                except Exception:
-                    # Fallback to basic text
-                    draw.text((50, 50), f'"{message_content}"', fill=(255, 255, 255), font=ImageFont.load_default())
-                    draw.text((50, 100), f"- {username}", fill=(255, 255, 255), font=ImageFont.load_default())
-            
-            # Composite the text onto the background
-            quote_img = Image.alpha_composite(quote_img.convert('RGBA'), text_img)
-            
-            # IMPORTANT: Scale up the final image to ensure it's large enough
-            final_size = 2000  # Final output size
-            quote_img = quote_img.resize((final_size, final_size), Image.Resampling.LANCZOS)
-            
-            # Save the image to a bytes buffer
-            buffer = io.BytesIO()
-            quote_img.convert('RGB').save(buffer, format='PNG')
-            buffer.seek(0)
-            
-            return buffer
+            # A quote is defined by the message, the avatar and what is drawn on it
+            quote_key = None
+            if avatar_key and message_id:
+                text_hash = hashlib.sha1(f"{username}\0{message_content}".encode('utf-8')).hexdigest()
+                quote_key = f"{message_id}:{avatar_key}:{text_hash}"
+                image = await self.quote_cache.get(quote_key)
+                if image is not None:
+                    return io.BytesIO(image)
+
+            tile = await self.get_avatar_tile(avatar_url, avatar_key)
+            # Text drawing and PNG encoding run in the render service
+            image = await self.client.render_service.render(
+                render_quote, tile, message_content, username, self.quote_font_path
+            )
+            if quote_key:
+                await self.quote_cache.set(quote_key, image)
+            return io.BytesIO(image)
         except Exception as e:
+            print(f"Error creating quote image: {str(e)}")
             return None
     
     @commands.command()
@@ -1060,14 +909,16 @@ class OtherCog(commands.Cog):
                 await temp_msg.edit(content="Error fetching the message.")
                 return
             
-            # Get the message author's avatar URL
-            avatar_url = replied_msg.author.display_avatar.url
+            # Get the message author's avatar URL and hash
+            avatar = replied_msg.author.display_avatar
             
             # Create the quote image
             image_buffer = await self.create_quote_image(
-                avatar_url, 
+                avatar.url, 
                 replied_msg.content, 
-                replied_msg.author.display_name
+                replied_msg.author.display_name,
+                avatar_key=avatar.key,
+                message_id=replied_msg.id
             )
             
             if image_buffer:
@@ -1187,7 +1038,7 @@ class OtherCog(commands.Cog):
             temp_msg = await ctx.send("Breaking open a fortune cookie...")
             
             # Fetch a random fortune from the API
-            response = requests.get("https://api.viewbits.com/v1/fortunecookie?mode=random")
+            response = await self.client.http_client.get("https://api.viewbits.com/v1/fortunecookie", params={"mode": "random"})
             
             if response.status_code != 200:
                 await temp_msg.edit(content="Failed to get a fortune cookie. Try again later.")
@@ -1239,13 +1090,26 @@ class OtherCog(commands.Cog):
         return self.weather_codes.get(weather_code, self.weather_codes[-1])
     
     async def geocode_location(self, location: str) -> Optional[Tuple[float, float, str, str]]:
+        key = " ".join(location.split()).lower()
+        cached = self.geocode_cache.get(key)
+        if cached is not None:
+            # False marks a location that wasn't found
+            return cached or None
+        
+        result = await self.geocode_location_uncached(location)
+        if result:
+            self.geocode_cache.set(key, result, self.geocode_ttl)
+        elif result is False:
+            self.geocode_cache.set(key, False, 60 * 60)
+        return result or None
+    
+    async def geocode_location_uncached(self, location: str):
+        # (latitude, longitude, name, country), False if not found, None on errors
         try:
-            # URL encode the location
-            encoded_location = location.replace(" ", "+")
-            
-            # Make request to geocoding API
-            geocode_url = f"https://geocoding-api.open-meteo.com/v1/search?name={encoded_location}&count=1&language=en&format=json"
-            response = requests.get(geocode_url)
+            # Make request to geocoding API (the client URL encodes the location)
+            geocode_url = "https://geocoding-api.open-meteo.com/v1/search"
+            params = {"name": location, "count": 1, "language": "en", "format": "json"}
+            response = await self.client.http_client.get(geocode_url, params=params)
             
             if response.status_code != 200:
                 return None
@@ -1254,7 +1118,7 @@ class OtherCog(commands.Cog):
             
             # Check if results were found
             if not data.get("results"):
-                return None
+                return False
                 
             # Get the first result
             result = data["results"][0]
@@ -1326,6 +1190,35 @@ class OtherCog(commands.Cog):
         # Limit to 5 days
         return daily_summary[:5]
     
+    async def get_forecasts(self, coordinates: List[Tuple[float, float]]) -> List[Optional[Dict]]:
+        # Forecasts for many coordinates, missing ones fetched in a single
+        # Open-Meteo request. Coordinates are rounded to ~1km for the cache.
+        keys = [(round(latitude, 2), round(longitude, 2)) for latitude, longitude in coordinates]
+        forecasts = [self.forecast_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, forecast in zip(keys, forecasts) if forecast is None))
+        
+        if missing:
+            params = {
+                "latitude": ",".join(str(latitude) for latitude, _ in missing),
+                "longitude": ",".join(str(longitude) for _, longitude in missing),
+                "current": "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,weather_code,wind_speed_10m",
+                "daily": "temperature_2m_max,temperature_2m_min,weather_code",
+                "timezone": "auto"
+            }
+            response = await self.client.http_client.get("https://api.open-meteo.com/v1/forecast", params=params)
+            if response.status_code != 200:
+                return forecasts
+            
+            # A single location comes back as an object, several as a list
+            data = response.json()
+            results = data if isinstance(data, list) else [data]
+            fetched = dict(zip(missing, results))
+            for key, forecast in fetched.items():
+                self.forecast_cache.set(key, forecast, self.forecast_ttl)
+            forecasts = [forecast if forecast is not None else fetched.get(key) for key, forecast in zip(keys, forecasts)]
+        
+        return forecasts
+    
     @commands.command()
     async def weather(self, ctx, *, location: str = None):
         if not location:
@@ -1334,6 +1227,12 @@ class OtherCog(commands.Cog):
             
         temp_msg = await ctx.send(f"Fetching weather data for {location}...")
         
+        # "Zurich, Bern, Basel" shows several locations at once
+        locations = [part.strip() for part in location.split(",") if part.strip()]
+        if len(locations) > 1:
+            await self.send_multi_location_weather(ctx, temp_msg, locations[:self.max_weather_locations])
+            return
+        
         try:
             geocode_result = await self.geocode_location(location)
             
@@ -1343,23 +1242,12 @@ class OtherCog(commands.Cog):
                 
             latitude, longitude, city_name, country = geocode_result
             
-            # Fetch weather data from Open-Meteo API
-            weather_url = (
-                f"https://api.open-meteo.com/v1/forecast"
-                f"?latitude={latitude}&longitude={longitude}"
-                f"&current=temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,weather_code,wind_speed_10m"
-                f"&hourly=temperature_2m,relative_humidity_2m,wind_speed_10m,weather_code"
-                f"&daily=temperature_2m_max,temperature_2m_min,weather_code"
-                f"&timezone=auto"
-            )
-            
-            response = requests.get(weather_url)
+            # Fetch weather data from Open-Meteo API (or the forecast cache)
+            weather_data = (await self.get_forecasts([(latitude, longitude)]))[0]
             
-            if response.status_code != 200:
+            if not weather_data:
                 await temp_msg.edit(content="Error fetching weather data. Please try again later.")
                 return
-                
-            weather_data = response.json()
             
             # Process current weather data
             current = weather_data["current"]
@@ -1434,6 +1322,52 @@ class OtherCog(commands.Cog):
             await temp_msg.edit(content=f"Error getting weather data: {str(e)}")
             print(f"Weather error: {traceback.format_exc()}")
     
+    async def send_multi_location_weather(self, ctx, temp_msg, locations: List[str]):
+        try:
+            geocoded = await asyncio.gather(*[self.geocode_location(location) for location in locations])
+            found = [(location, result) for location, result in zip(locations, geocoded) if result]
+            not_found = [location for location, result in zip(locations, geocoded) if not result]
+            
+            if not found:
+                await temp_msg.edit(content=f"Couldn't find any of these locations: {', '.join(locations)}")
+                return
+            
+            # All coordinates in one forecast request
+            forecasts = await self.get_forecasts([(result[0], result[1]) for _, result in found])
+            
+            embed = discord.Embed(
+                title="Weather",
+                color=0x3498db
+            )
+            for (location, (_, _, city_name, country)), weather_data in zip(found, forecasts):
+                location_name = f"{city_name}, {country}" if country else city_name
+                if not weather_data:
+                    embed.add_field(name=location_name, value="No weather data available", inline=True)
+                    continue
+                
+                current = weather_data["current"]
+                daily = weather_data["daily"]
+                embed.add_field(
+                    name=location_name,
+                    value=f"{self.get_weather_emoji(current['weather_code'])} **{round(current['temperature_2m'])}°C** "
+                          f"(feels {round(current['apparent_temperature'])}°C)\n"
+                          f"🔽 {round(daily['temperature_2m_min'][0])}°C / 🔼 {round(daily['temperature_2m_max'][0])}°C\n"
+                          f"💧 {current['relative_humidity_2m']}% | 💨 {current['wind_speed_10m']} km/h",
+                    inline=True
+                )
+            
+            if not_found:
+                embed.add_field(name="Not Found", value=", ".join(not_found), inline=False)
+            
+            embed.set_footer(text=f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            await ctx.send(embed=embed)
+            await temp_msg.delete()
+            
+        except Exception as e:
+            await temp_msg.edit(content=f"Error getting weather data: {str(e)}")
+            print(f"Weather error: {traceback.format_exc()}")
+    
     def clean_image_cache(self):
         if len(self.image_search_cache) > self.max_cache_size:
             num_to_remove = max(1, int(self.max_cache_size * 0.2))
@@ -1571,7 +1505,7 @@ class OtherCog(commands.Cog):
                     }
                     
                     # Make the request
-                    response = requests.get(search_url, params=params, timeout=10)
+                    response = await self.client.http_client.get(search_url, params=params, timeout=10)
                     
                     if response.status_code != 200:
                         print(f"Error searching for images: {response.status_code} {response.text}")
@@ -1619,7 +1553,7 @@ class OtherCog(commands.Cog):
                     image_url = f"https://source.unsplash.com/featured/?{encoded_query}&sig={i}&random={random_param}"
                     
                     # Verify the image URL is valid by making a HEAD request
-                    head_response = requests.head(image_url, timeout=5)
+                    head_response = await self.client.http_client.head(image_url, timeout=5)
                     if head_response.status_code != 200:
                         continue
                     
@@ -2214,11 +2148,6 @@ class OtherCog(commands.Cog):
             
             # For image requests, we need to use a different approach
             if has_image:
-                # Save the image to a temporary file
-                temp_image_path = f"temp_image_{ctx.author.id}.{file_ext}"
-                with open(temp_image_path, "wb") as f:
-                    f.write(image_bytes)
-                
                 # Create multipart form data
                 data = {
                     "model": model,
@@ -2228,7 +2157,7 @@ class OtherCog(commands.Cog):
                 }
                 
                 files = {
-                    "image": (f"image.{file_ext}", open(temp_image_path, "rb"), mime_type)
+                    "image": (f"image.{file_ext}", image_bytes, mime_type)
                 }
                 
                 # Debug info
@@ -2236,26 +2165,15 @@ class OtherCog(commands.Cog):
                 print(f"Request data: {json.dumps(data, indent=2)[:500]}...")  # Print first 500 chars
                 
                 try:
-                    response = requests.post(
+                    response = await self.client.http_client.post(
                         "https://api.deepseek.com/v1/chat/completions",
                         headers=headers,
                         data=data,
                         files=files,
                         timeout=60  # Increased timeout for image processing
                     )
-                    
-                    # Clean up the temporary file
-                    try:
-                        os.remove(temp_image_path)
-                    except:
-                        pass
                 except Exception as e:
                     await loading_msg.edit(content=f"❌ Error with image upload: {str(e)}")
-                    # Clean up the temporary file
-                    try:
-                        os.remove(temp_image_path)
-                    except:
-                        pass
                     return
             else:
                 # Regular text request
@@ -2270,7 +2188,7 @@ class OtherCog(commands.Cog):
                 print(f"Using model: {model}")
                 print(f"Request data: {json.dumps(data, indent=2)[:500]}...")  # Print first 500 chars
                 
-                response = requests.post(
+                response = await self.client.http_client.post(
                     "https://api.deepseek.com/v1/chat/completions",
                     headers=headers,
                     json=data,
@@ -2377,7 +2295,7 @@ class OtherCog(commands.Cog):
             api_url = "https://libretranslate.de/detect"
             data = {"q": text}
             
-            response = requests.post(api_url, data=data, timeout=10)
+            response = await self.client.http_client.post(api_url, data=data, timeout=10, retry=True)
             
             if response.status_code != 200:
                 return "en"  # Default to English if detection fails
@@ -2418,7 +2336,7 @@ class OtherCog(commands.Cog):
                 "target": target_lang
             }
             
-            response = requests.post(api_url, data=data, timeout=15)
+            response = await self.client.http_client.post(api_url, data=data, timeout=15, retry=True)
             
             if response.status_code != 200:
                 # Try an alternative API as fallback
@@ -2444,7 +2362,7 @@ class OtherCog(commands.Cog):
             # Try LingvaTranslate API as fallback
             api_url = f"https://lingva.ml/api/v1/{source_lang or 'auto'}/{target_lang}/{text}"
             
-            response = requests.get(api_url, timeout=15)
+            response = await self.client.http_client.get(api_url, timeout=15)
             
             if response.status_code == 200:
                 result = response.json()
@@ -2463,7 +2381,7 @@ class OtherCog(commands.Cog):
                 "q": text
             }
             
-            response = requests.post(api_url, json=data, timeout=15)
+            response = await self.client.http_client.post(api_url, json=data, timeout=15, retry=True)
             
             if response.status_code == 200:
                 result = response.json()
@@ -2750,11 +2668,8 @@ class OtherCog(commands.Cog):
             await ctx.send("Please specify at most 250 words for the typing test.")
             return
             
-        # Generate random words
-        selected_words = random.sample(self.common_words, min(len(self.common_words), word_count))
-        
-        # Create image with the words
-        image_buffer = await self.create_typing_test_image(selected_words)
+        # Random words and their image, usually ready-made from the pool
+        selected_words, image_buffer = await self.new_typing_test(word_count)
         
         if not image_buffer:
             await ctx.send("Failed to create typing test image. Please try again.")
@@ -2818,8 +2733,9 @@ class OtherCog(commands.Cog):
         # Generate a unique challenge ID
         challenge_id = f"{ctx.author.id}-{user.id}-{int(time.time())}"
         
-        # Generate random words for the challenge
-        selected_words = random.sample(self.common_words, min(len(self.common_words), word_count))
+        # Generate random words for the challenge, with a pre-rendered image if one is pooled
+        pooled = self.typing_pool.take(word_count)
+        selected_words, image = pooled if pooled else (self.pick_typing_words(word_count), None)
         
         # Store the challenge information
         self.typing_challenges[challenge_id] = {
@@ -2827,6 +2743,7 @@ class OtherCog(commands.Cog):
             "challenged": user.id,
             "word_count": word_count,
             "words": selected_words,
+            "image": image,
             "results": {},
             "channel_id": ctx.channel.id,
             "created_at": datetime.now()
@@ -2969,7 +2886,7 @@ class OtherCog(commands.Cog):
         await countdown_msg.edit(content="Go!")
         
         # Create image with the words
-        image_buffer = await self.create_typing_test_image(challenge["words"])
+        image_buffer = await self.challenge_test_image(challenge)
         
         if not image_buffer:
             await ctx.send("Failed to create typing test image. Please try again.")
@@ -3060,7 +2977,7 @@ class OtherCog(commands.Cog):
                 return
                 
             # Create image with the words
-            image_buffer = await self.create_typing_test_image(challenge["words"])
+            image_buffer = await self.challenge_test_image(challenge)
             
             if not image_buffer:
                 await interaction.response.send_message("Failed to create typing test image. Please try again.", ephemeral=True)
@@ -3168,92 +3085,54 @@ class OtherCog(commands.Cog):
             
         await ctx.send(embed=embed)
     
+    async def render_typing_words(self, words):
+        return await self.client.render_service.render(
+            render_typing_test, list(words), self.typing_font_path, random.random()
+        )
+
     async def create_typing_test_image(self, words):
         try:
-            # Create a blank image with white background
-            width = 1000
-            height = 600
-            image = Image.new('RGB', (width, height), (255, 255, 255))
-            draw = ImageDraw.Draw(image)
-            
-            # Try to find a system font
-            system_fonts = [
-                '/usr/share/fonts/TTF/DejaVuSans.ttf',  # Linux
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Ubuntu
-                '/Library/Fonts/Arial.ttf',  # macOS
-                'C:\\Windows\\Fonts\\arial.ttf',  # Windows
-                self.font_path
-            ]
-            
-            font_path = None
-            for font in system_fonts:
-                if font and os.path.exists(font):
-                    font_path = font
-                    break
-                    
-            # Use default font if none found
-            if not font_path:
-                # Add text using default font
-                text = " ".join(words)
-                lines = textwrap.wrap(text, width=40)
-                y_position = 50
-                
-                for line in lines:
-                    draw.text((50, y_position), line, fill=(0, 0, 0), font=ImageFont.load_default())
-                    y_position += 20
-            else:
-                # Use custom font
-                font_size = 24
-                font = ImageFont.truetype(font_path, font_size)
-                
-                # Join words with spaces
-                text = " ".join(words)
-                
-                # Wrap text to fit the image width
-                lines = []
-                current_line = []
-                current_width = 0
-                max_width = width - 100  # Leave some margin
-                
-                for word in words:
-                    # Get word dimensions
-                    word_bbox = draw.textbbox((0, 0), word + " ", font=font)
-                    word_width = word_bbox[2] - word_bbox[0]
-                    
-                    if current_width + word_width <= max_width:
-                        current_line.append(word)
-                        current_width += word_width
-                    else:
-                        lines.append(" ".join(current_line))
-                        current_line = [word]
-                        current_width = word_width
-                
-                # Add the last line
-                if current_line:
-                    lines.append(" ".join(current_line))
-                
-                # Draw the text
-                y_position = 50
-                for line in lines:
-                    draw.text((50, y_position), line, fill=(0, 0, 0), font=font)
-                    y_position += font_size * 1.5
-                    
-                # Add some visual noise to prevent OCR
-                for _ in range(30):
-                    x1 = random.randint(0, width)
-                    y1 = random.randint(0, height)
-                    x2 = random.randint(0, width)
-                    y2 = random.randint(0, height)
-                    color = (random.randint(100, 200), random.randint(100, 200), random.randint(100, 200))
-                    draw.line([(x1, y1), (x2, y2)], fill=color, width=2)
-            
-            # Save the image to a bytes buffer
-            buffer = io.BytesIO()
-            image.save(buffer, format='PNG')
-            buffer.seek(0)
-            
-            return buffer
+            return io.BytesIO(await self.render_typing_words(words))
         except Exception as e:
             print(f"Error creating typing test image: {str(e)}")
             return None
-    
\ No newline at end of file
+
+    def pick_typing_words(self, word_count):
+        return random.sample(self.common_words, min(len(self.common_words), word_count))
+
+    async def new_typing_test(self, word_count):
+        # (words, image buffer), from the pre-rendered pool when possible
+        pooled = self.typing_pool.take(word_count)
+        if pooled:
+            words, image = pooled
+            return words, io.BytesIO(image)
+        words = self.pick_typing_words(word_count)
+        return words, await self.create_typing_test_image(words)
+
+    async def challenge_test_image(self, challenge):
+        # Both players see the same image, rendered (or pooled) once per challenge
+        if not challenge.get("image"):
+            try:
+                challenge["image"] = await self.render_typing_words(challenge["words"])
+            except Exception as e:
+                print(f"Error creating typing test image: {str(e)}")
+                return None
+        return io.BytesIO(challenge["image"])
+
+    @commands.command(aliases=['mtpool'])
+    async def mtpoolstats(self, ctx):
+        # Check if the user has admin permissions
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.send("Only administrators can view typing test pool stats.")
+            return
+
+        pool = self.typing_pool
+        embed = discord.Embed(
+            title="Typing Test Pool",
+            description=f"Hits: **{pool.hits:,}** | Misses: **{pool.misses:,}** | Hit rate: **{pool.hit_rate:.1%}**\n"
+                        f"Rendered: **{pool.renders:,}** | Errors: **{pool.errors:,}**",
+            color=0x00FFFF
+        )
+        for size, tests in pool.pool.items():
+            embed.add_field(name=f"{size} words", value=f"{len(tests)} / {pool.per_size} ready", inline=True)
+        await ctx.send(embed=embed)
@@ -0,0 +1,96 @@
+import time
+
+
+class MessageContext:
+    """State shared by every pipeline stage for one message.
+
+    The command context is parsed once, and the lowercased content is computed
+    once, so stages don't redo that work. A stage can call stop() to skip all
+    later stages, e.g. after automod deleted the message.
+    """
+
+    def __init__(self, message, command_ctx, guild_settings):
+        self.message = message
+        self.command_ctx = command_ctx
+        self.content = message.content
+        self.content_lower = message.content.lower()
+        self.guild_settings = guild_settings
+        self.stopped = False
+        self.stop_reason = None
+        self.timings = {}
+
+    @property
+    def is_command(self):
+        return bool(self.command_ctx and self.command_ctx.valid)
+
+    def stop(self, reason=None):
+        self.stopped = True
+        self.stop_reason = reason
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.errors = 0
+        self.stops = 0
+
+    def record(self, elapsed):
+        self.calls += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+    @property
+    def avg_time(self):
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class MessagePipeline:
+    """Ordered list of message handlers run once per incoming message.
+
+    Stages are registered by cogs with an order number (lower runs first):
+        10 automod, 20 commands, 30 afk/typing tests, 40 auto reactions, 50 xp
+    """
+
+    def __init__(self, client, slow_stage_threshold=0.5):
+        self.client = client
+        self.slow_stage_threshold = slow_stage_threshold
+        self.stages = []
+        self.stats = {}
+
+    def register(self, name, handler, order=100):
+        self.unregister(name)
+        self.stages.append((order, name, handler))
+        self.stages.sort(key=lambda stage: stage[0])
+        self.stats.setdefault(name, StageStats())
+
+    def unregister(self, name):
+        self.stages = [stage for stage in self.stages if stage[1] != name]
+
+    async def process(self, message):
+        command_ctx = await self.client.get_context(message)
+        guild_settings = self.client.guild_settings.guild(message.guild.id) if message.guild else {}
+        mctx = MessageContext(message, command_ctx, guild_settings)
+
+        for order, name, handler in list(self.stages):
+            stats = self.stats.setdefault(name, StageStats())
+            start = time.perf_counter()
+            try:
+                await handler(mctx)
+            except Exception as e:
+                stats.errors += 1
+                print(f"Error in message stage {name}: {e}")
+            elapsed = time.perf_counter() - start
+            stats.record(elapsed)
+            mctx.timings[name] = elapsed
+
+            if elapsed > self.slow_stage_threshold:
+                print(f"Slow message stage {name}: {elapsed * 1000:.0f}ms")
+
+            if mctx.stopped:
+                stats.stops += 1
+                break
+
+        return mctx
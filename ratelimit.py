@@ -0,0 +1,39 @@
+import asyncio
+
+
+class KeyedRateLimiter:
+    """Spaces out calls per key (e.g. per channel or per host).
+
+    acquire() waits until the key's next free slot. If too many callers are
+    already waiting on the same key it returns False right away, so bursts
+    are dropped instead of piling up.
+    """
+
+    def __init__(self, interval, max_pending=None):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.next_slot = {}
+        self.pending = {}
+
+    async def acquire(self, key=None):
+        pending = self.pending.get(key, 0)
+        if self.max_pending is not None and pending >= self.max_pending:
+            return False
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if len(self.next_slot) > 1000:
+            # Forget idle keys so the dict doesn't grow with every channel
+            self.next_slot = {k: v for k, v in self.next_slot.items() if v > now or k in self.pending}
+        slot = max(now, self.next_slot.get(key, now))
+        self.next_slot[key] = slot + self.interval
+
+        self.pending[key] = pending + 1
+        try:
+            if slot > now:
+                await asyncio.sleep(slot - now)
+        finally:
+            self.pending[key] -= 1
+            if not self.pending[key]:
+                del self.pending[key]
+        return True
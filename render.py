@@ -0,0 +1,247 @@
+"""Pure Pillow render functions for image commands.
+
+Every function takes plain data (bytes, strings, lists) and returns encoded
+image bytes, so it can run in a worker process of the RenderService.
+"""
+import io
+import os
+import random
+import textwrap
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Candidate fonts, the first one that exists is used. Callers resolve these
+# once with find_font and pass the path to the render functions.
+QUOTE_FONTS = [
+    '/usr/share/fonts/TTF/DejaVuSans-Bold.ttf',  # Linux
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',  # Ubuntu
+    '/Library/Fonts/Arial Bold.ttf',  # macOS
+    'C:\\Windows\\Fonts\\arialbd.ttf',  # Windows
+    # Add fallbacks
+    '/usr/share/fonts/TTF/Arial.ttf',
+    '/usr/share/fonts/truetype/msttcorefonts/Arial.ttf',
+]
+
+TYPING_TEST_FONTS = [
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',  # Linux
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Ubuntu
+    '/Library/Fonts/Arial.ttf',  # macOS
+    'C:\\Windows\\Fonts\\arial.ttf',  # Windows
+]
+
+
+def find_font(candidates, fallback=None):
+    for font in candidates + [fallback]:
+        if font and os.path.exists(font):
+            return font
+    return None
+
+
+@lru_cache(maxsize=256)
+def load_font(font_path, size):
+    # Loaded FreeTypeFont objects are reused by every render in this process
+    return ImageFont.truetype(font_path, size)
+
+
+def fit_font_size(draw, text, font_path, target_width, sizes=range(20, 500, 10)):
+    # Largest size whose rendered text is at most target_width wide, found by
+    # binary search since width grows with size. Falls back to the smallest size.
+    low, high = 0, len(sizes) - 1
+    best = sizes[0]
+    while low <= high:
+        middle = (low + high) // 2
+        bbox = draw.textbbox((0, 0), text, font=load_font(font_path, sizes[middle]))
+        if bbox[2] - bbox[0] > target_width:
+            high = middle - 1
+        else:
+            best = sizes[middle]
+            low = middle + 1
+    return best
+
+
+def wrap_words(text, words_per_line=4):
+    # Custom line wrapping that wraps after a fixed number of words
+    words = text.split()
+    lines = [' '.join(words[i:i + words_per_line]) for i in range(0, len(words), words_per_line)]
+    return '\n'.join(lines)
+
+
+QUOTE_SIZE = 1000
+
+
+def render_avatar_tile(avatar_bytes):
+    # Square, darkened QUOTE_SIZE background tile for quotes, as PNG. This is
+    # the expensive part of a quote that only depends on the avatar.
+    avatar_image = Image.open(io.BytesIO(avatar_bytes))
+
+    size = QUOTE_SIZE
+
+    width, height = avatar_image.size
+
+    if width > height:
+        # Image is wider than tall
+        new_width = int(width * size / height)
+        new_height = size
+        left_crop = (new_width - size) // 2
+        top_crop = 0
+    else:
+        # Image is taller than wide
+        new_width = size
+        new_height = int(height * size / width)
+        left_crop = 0
+        top_crop = (new_height - size) // 2
+
+    # Resize and crop to fill the square
+    avatar_image = avatar_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    avatar_image = avatar_image.crop((left_crop, top_crop, left_crop + size, top_crop + size))
+
+    # Add a dark overlay to make text more readable
+    overlay = Image.new('RGBA', (size, size), (0, 0, 0, 230))  # Very dark overlay
+    tile = Image.alpha_composite(avatar_image.convert('RGBA'), overlay).convert('RGB')
+
+    buffer = io.BytesIO()
+    tile.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def render_quote(tile_bytes, message_content, username, font_path=None):
+    # tile_bytes comes from render_avatar_tile
+    quote_img = Image.open(io.BytesIO(tile_bytes))
+    size = QUOTE_SIZE
+
+    # Create a blank image for the text with transparent background
+    text_img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(text_img)
+
+    # If no font found, we'll have to use default
+    if not font_path:
+        # Create a simple text overlay with basic text
+        draw.text((50, 50), f'"{message_content}"', fill=(255, 255, 255), font=ImageFont.load_default())
+        draw.text((50, 100), f"- {username}", fill=(255, 255, 255), font=ImageFont.load_default())
+    else:
+        # Wrap the text with 3-5 words per line
+        wrapped_text = wrap_words(message_content, 4)  # 4 words per line on average
+
+        # Add quotation marks
+        quote_text = f'"{wrapped_text}"'
+
+        # We'll make the text take up about 80% of the image width
+        target_text_width = int(size * 0.8)
+
+        try:
+            # Find the largest font size that fits within our target width
+            longest_line = max(wrapped_text.split('\n'), key=len)
+            font_size = fit_font_size(draw, f'"{longest_line}"', font_path, target_text_width)
+
+            quote_font = load_font(font_path, font_size)
+            username_font = load_font(font_path, font_size // 2)  # Username half the size
+
+            # Get text dimensions
+            quote_bbox = draw.textbbox((0, 0), quote_text, font=quote_font)
+            quote_width = quote_bbox[2] - quote_bbox[0]
+            quote_height = quote_bbox[3] - quote_bbox[1]
+
+            # Center the text
+            quote_x = (size - quote_width) // 2
+            quote_y = (size - quote_height) // 2 - size // 8  # Slightly above center
+
+            # Draw text with shadow for better visibility
+            shadow_offset = max(3, font_size // 20)  # Scale shadow with font size
+
+            for dx, dy in [(shadow_offset, shadow_offset), (-shadow_offset, shadow_offset),
+                          (shadow_offset, -shadow_offset), (-shadow_offset, -shadow_offset)]:
+                draw.text((quote_x + dx, quote_y + dy), quote_text, fill=(0, 0, 0), font=quote_font)
+
+            draw.text((quote_x, quote_y), quote_text, fill=(255, 255, 255), font=quote_font)
+
+            # Add username at bottom right
+            username_text = f"- {username}"
+            username_bbox = draw.textbbox((0, 0), username_text, font=username_font)
+            username_width = username_bbox[2] - username_bbox[0]
+
+            username_x = size - username_width - (size // 20)
+            username_y = size - (size // 5)
+
+            for dx, dy in [(shadow_offset//2, shadow_offset//2), (-shadow_offset//2, shadow_offset//2),
+                          (shadow_offset//2, -shadow_offset//2), (-shadow_offset//2, -shadow_offset//2)]:
+                draw.text((username_x + dx, username_y + dy), username_text, fill=(0, 0, 0), font=username_font)
+
+            draw.text((username_x, username_y), username_text, fill=(255, 255, 255), font=username_font)
+
+        except Exception:
+            # Fallback to basic text
+            draw.text((50, 50), f'"{message_content}"', fill=(255, 255, 255), font=ImageFont.load_default())
+            draw.text((50, 100), f"- {username}", fill=(255, 255, 255), font=ImageFont.load_default())
+
+    # Composite the text onto the background
+    quote_img = Image.alpha_composite(quote_img.convert('RGBA'), text_img)
+
+    # Scale up the final image to ensure it's large enough
+    final_size = 2000
+    quote_img = quote_img.resize((final_size, final_size), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    quote_img.convert('RGB').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_typing_test(words, font_path=None, seed=None):
+    # seed keeps the noise different per job, forked workers share random state
+    rng = random.Random(seed)
+    width = 1000
+    height = 600
+    image = Image.new('RGB', (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+
+    # Use default font if none found
+    if not font_path:
+        text = " ".join(words)
+        lines = textwrap.wrap(text, width=40)
+        y_position = 50
+
+        for line in lines:
+            draw.text((50, y_position), line, fill=(0, 0, 0), font=ImageFont.load_default())
+            y_position += 20
+    else:
+        font_size = 24
+        font = load_font(font_path, font_size)
+
+        # Wrap text to fit the image width
+        lines = []
+        current_line = []
+        current_width = 0
+        max_width = width - 100  # Leave some margin
+
+        for word in words:
+            word_bbox = draw.textbbox((0, 0), word + " ", font=font)
+            word_width = word_bbox[2] - word_bbox[0]
+
+            if current_width + word_width <= max_width:
+                current_line.append(word)
+                current_width += word_width
+            else:
+                lines.append(" ".join(current_line))
+                current_line = [word]
+                current_width = word_width
+
+        if current_line:
+            lines.append(" ".join(current_line))
+
+        y_position = 50
+        for line in lines:
+            draw.text((50, y_position), line, fill=(0, 0, 0), font=font)
+            y_position += font_size * 1.5
+
+        # Add some visual noise to prevent OCR
+        for _ in range(30):
+            x1 = rng.randint(0, width)
+            y1 = rng.randint(0, height)
+            x2 = rng.randint(0, width)
+            y2 = rng.randint(0, height)
+            color = (rng.randint(100, 200), rng.randint(100, 200), rng.randint(100, 200))
+            draw.line([(x1, y1), (x2, y2)], fill=color, width=2)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
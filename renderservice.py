@@ -0,0 +1,174 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderStats:
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed):
+        self.completed += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+    @property
+    def avg_time(self):
+        return self.total_time / self.completed if self.completed else 0.0
+
+
+class RenderService:
+    """Runs CPU-heavy render functions in a process pool.
+
+    Jobs are module-level functions taking and returning plain data (bytes in,
+    bytes out), so nothing but the arguments and the encoded image crosses the
+    process boundary. At most max_queue jobs may be waiting or running, more
+    are rejected with RenderQueueFull instead of piling up, and each job
+    has a timeout. A job that times out while running replaces the pool:
+    the old pool's other jobs finish, then its workers are terminated.
+    Stats are kept per job function.
+    """
+
+    def __init__(self, max_workers=2, max_queue=16, timeout=20):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.executor = None
+        self.inflight = {}  # executor -> set of concurrent futures submitted to it
+        self.retiring = set()  # tasks shutting down replaced pools
+        self.pending = 0
+        self.rejected = 0
+        self.stats = {}
+
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self.inflight[self.executor] = set()
+        return self.executor
+
+    def retire(self, executor, hung=None):
+        # A hung worker can't be cancelled. New jobs go to a fresh pool, the
+        # old one finishes its other jobs and then has its workers terminated.
+        if executor is not self.executor:
+            return
+        self.executor = None
+        task = asyncio.get_running_loop().create_task(self.drain(executor, hung))
+        self.retiring.add(task)
+        task.add_done_callback(self.retiring.discard)
+
+    async def drain(self, executor, hung):
+        others = [asyncio.wrap_future(future) for future in self.inflight.get(executor, ()) if future is not hung]
+        if others:
+            # Every job has its own timeout, so this never waits much longer
+            await asyncio.wait(others, timeout=self.timeout * 2)
+        self.terminate(executor)
+
+    def terminate(self, executor):
+        self.inflight.pop(executor, None)
+        # ProcessPoolExecutor has no public way to kill a busy worker
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        executor.shutdown(wait=False)
+
+    async def render(self, func, *args, timeout=None):
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFull(f"{self.pending} render jobs already queued")
+
+        stats = self.stats.setdefault(func.__name__, RenderStats())
+        self.pending += 1
+        start = time.perf_counter()
+        executor = self.get_executor()
+        future = executor.submit(func, *args)
+        self.inflight[executor].add(future)
+        future.add_done_callback(self.inflight[executor].discard)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            # Only this job fails, other callers' jobs keep running
+            if not future.cancel():
+                self.retire(executor, hung=future)
+            raise
+        except BrokenProcessPool:
+            stats.failed += 1
+            self.retire(executor)
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        stats.record(time.perf_counter() - start)
+        return result
+
+    def close(self):
+        for task in list(self.retiring):
+            task.cancel()
+        for executor in list(self.inflight):
+            self.terminate(executor)
+        self.executor = None
+
+
+if __name__ == "__main__":
+    # Benchmark: python renderservice.py
+    # Compares rendering on the event loop with the process pool and reports
+    # how long the loop was blocked in each case.
+    import io
+    from PIL import Image
+    from render import QUOTE_FONTS, TYPING_TEST_FONTS, find_font, render_quote, render_typing_test
+
+    avatar = io.BytesIO()
+    Image.new("RGB", (512, 512), (120, 80, 200)).save(avatar, "PNG")
+    avatar = avatar.getvalue()
+    words = ("the quick brown fox jumps over the lazy dog " * 6).split()
+    quote_font = find_font(QUOTE_FONTS)
+    typing_font = find_font(TYPING_TEST_FONTS)
+    jobs = [(render_quote, avatar, "this is a pretty good quote if you ask me", "someone", quote_font),
+            (render_typing_test, words, typing_font, 1)] * 4
+
+    async def watch_loop(lags):
+        # Measures how late a 10ms sleep wakes up, i.e. how long the loop was blocked
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    async def inline():
+        for func, *args in jobs:
+            func(*args)
+            await asyncio.sleep(0)
+
+    async def pooled(service):
+        await asyncio.gather(*[service.render(func, *args) for func, *args in jobs])
+
+    async def main():
+        service = RenderService(max_workers=2)
+        # Warm up the workers so process start-up isn't measured
+        await service.render(render_typing_test, words, typing_font, 1)
+        for name, run in [("inline", inline), ("process pool", lambda: pooled(service))]:
+            lags = []
+            watcher = asyncio.create_task(watch_loop(lags))
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            await run()
+            elapsed = time.perf_counter() - start
+            watcher.cancel()
+            print(f"{name:13} {len(jobs)} jobs in {elapsed * 1000:7.1f} ms, "
+                  f"max loop stall {max(lags, default=0) * 1000:6.1f} ms")
+        for func_name, stats in service.stats.items():
+            print(f"  {func_name}: avg {stats.avg_time * 1000:.1f} ms, max {stats.max_time * 1000:.1f} ms")
+        service.close()
+
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+import asyncio
+import heapq
+import json
+import os
+import time
+
+from jsonstore import atomic_write_json
+
+
+class JobScheduler:
+    """Persistent scheduler for one-off timed jobs, driven by a single task.
+
+    Jobs are JSON dicts with an 'id', a 'due' POSIX timestamp and any other
+    fields the caller passes in. They live in a min-heap of due times and in
+    a JSON file, so they survive restarts; jobs that came due while the bot
+    was offline run right after startup. Jobs are also indexed by
+    index_field (e.g. user_id) for listing.
+
+    The file is loaded lazily by the scheduler task (or the first call that
+    needs it), so cog loading never waits on disk. A job is removed from the
+    file before handler(job) is called, so it runs at most once. All jobs
+    that are due when the task wakes up are handled as one batch.
+    """
+
+    def __init__(self, path, handler, index_field='user_id'):
+        self.path = path
+        self.handler = handler
+        self.index_field = index_field
+        self.jobs = None  # id -> job, None until loaded
+        self.index = {}  # index_field value -> {id: job}
+        self.heap = []
+        self.next_id = 1
+        self.load_lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.fired = 0
+
+    def __len__(self):
+        return len(self.jobs or {})
+
+    def read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            content = f.read().strip()
+        if not content:
+            return {}
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            print(f"Error reading {self.path}, starting without scheduled jobs")
+            return {}
+
+    async def load(self):
+        async with self.load_lock:
+            if self.jobs is not None:
+                return
+            data = await asyncio.to_thread(self.read_file)
+            self.jobs = {}
+            self.next_id = data.get("next_id", 1)
+            for job in data.get("jobs", []):
+                self.track(job)
+
+    async def save(self):
+        data = {"next_id": self.next_id, "jobs": list(self.jobs.values())}
+        await asyncio.to_thread(atomic_write_json, self.path, data)
+
+    def track(self, job):
+        self.jobs[job["id"]] = job
+        self.index.setdefault(job.get(self.index_field), {})[job["id"]] = job
+        heapq.heappush(self.heap, (job["due"], job["id"]))
+        self.next_id = max(self.next_id, job["id"] + 1)
+
+    def untrack(self, job_id):
+        job = self.jobs.pop(job_id, None)
+        if job is not None:
+            key = job.get(self.index_field)
+            jobs = self.index.get(key)
+            if jobs is not None:
+                jobs.pop(job_id, None)
+                if not jobs:
+                    del self.index[key]
+        # The heap entry is skipped once it reaches the top
+        return job
+
+    async def add(self, due, **fields):
+        await self.load()
+        job = {"id": self.next_id, "due": due, **fields}
+        self.track(job)
+        await self.save()
+        if self.heap[0][1] == job["id"]:
+            # New earliest job, the scheduler has to sleep less
+            self.wakeup.set()
+        return job
+
+    async def cancel(self, job_id):
+        await self.load()
+        job = self.untrack(job_id)
+        if job is not None:
+            await self.save()
+        return job
+
+    async def cancel_where(self, **fields):
+        # Cancel every job whose fields match, returns the cancelled jobs
+        await self.load()
+        matching = [job_id for job_id, job in self.jobs.items()
+                    if all(job.get(name) == value for name, value in fields.items())]
+        cancelled = [self.untrack(job_id) for job_id in matching]
+        if cancelled:
+            await self.save()
+        return cancelled
+
+    async def jobs_for(self, key):
+        # Pending jobs for one index value, earliest first
+        await self.load()
+        return sorted(self.index.get(key, {}).values(), key=lambda job: job["due"])
+
+    async def run(self):
+        await self.load()
+        while True:
+            # Drop heap entries of cancelled jobs
+            while self.heap and self.heap[0][1] not in self.jobs:
+                heapq.heappop(self.heap)
+
+            self.wakeup.clear()
+            now = time.time()
+            if not self.heap or self.heap[0][0] > now:
+                timeout = self.heap[0][0] - now if self.heap else None
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Everything due in this tick is taken off the heap together and
+            # removed from the file with a single write
+            batch = []
+            while self.heap and self.heap[0][0] <= now:
+                _, job_id = heapq.heappop(self.heap)
+                job = self.untrack(job_id)
+                if job is not None:
+                    batch.append(job)
+            if not batch:
+                continue
+            try:
+                await self.save()
+            except Exception as e:
+                print(f"Error saving {self.path}: {e}")
+            self.fired += len(batch)
+            await self.dispatch(batch)
+
+    async def dispatch(self, batch):
+        # Handlers of one batch run concurrently, one failure doesn't stop the rest
+        results = await asyncio.gather(*(self.handler(job) for job in batch), return_exceptions=True)
+        for job, result in zip(batch, results):
+            if isinstance(result, Exception):
+                print(f"Error running scheduled job {job['id']} from {self.path}: {result}")
+
+    async def run_forever(self):
+        while True:
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error in scheduler for {self.path}: {e}")
+                await asyncio.sleep(5)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run_forever())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
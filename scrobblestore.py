@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def name_key(name):
+    # Case and whitespace insensitive key, the way Last.fm matches names
+    return " ".join((name or "").split()).lower()
+
+
+class ScrobbleStore:
+    """Local copy of linked users' scrobble history in SQLite.
+
+    Scrobbles are indexed by artist, album and track (on normalized keys) and
+    by time, so server charts and "who knows" rankings are plain local
+    aggregations. Every public coroutine runs its query in a worker thread;
+    a lock serializes access to the single connection.
+    """
+
+    def __init__(self, path='data/scrobbles.db'):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS scrobbles (
+                user TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                artist TEXT NOT NULL,
+                album TEXT NOT NULL,
+                track TEXT NOT NULL,
+                artist_key TEXT NOT NULL,
+                album_key TEXT NOT NULL,
+                track_key TEXT NOT NULL,
+                UNIQUE (user, ts, artist_key, track_key)
+            );
+            CREATE INDEX IF NOT EXISTS scrobbles_artist ON scrobbles (artist_key, user);
+            CREATE INDEX IF NOT EXISTS scrobbles_album ON scrobbles (artist_key, album_key, user);
+            CREATE INDEX IF NOT EXISTS scrobbles_track ON scrobbles (artist_key, track_key, user);
+            CREATE INDEX IF NOT EXISTS scrobbles_user_ts ON scrobbles (user, ts);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                user TEXT PRIMARY KEY,
+                last_ts INTEGER NOT NULL,
+                synced_at INTEGER NOT NULL
+            );
+        """)
+        self.db.commit()
+
+    def run(self, func, *args):
+        def locked():
+            with self.lock:
+                return func(*args)
+        return asyncio.to_thread(locked)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    # Sync state
+
+    def _last_ts(self, user):
+        row = self.db.execute("SELECT last_ts FROM sync_state WHERE user = ?", (name_key(user),)).fetchone()
+        return row[0] if row else None
+
+    async def last_ts(self, user):
+        # Timestamp of the newest stored scrobble, None if never synced
+        return await self.run(self._last_ts, user)
+
+    def _add_scrobbles(self, user, scrobbles):
+        user = name_key(user)
+        rows = [
+            (user, ts, artist, album, track, name_key(artist), name_key(album), name_key(track))
+            for ts, artist, album, track in scrobbles
+        ]
+        newest = max((row[1] for row in rows), default=None)
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO scrobbles "
+                "(user, ts, artist, album, track, artist_key, album_key, track_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            # Only ever move forward, pages are stored oldest first
+            self.db.execute(
+                "INSERT INTO sync_state (user, last_ts, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (user) DO UPDATE SET "
+                "last_ts = MAX(last_ts, excluded.last_ts), synced_at = excluded.synced_at",
+                (user, newest or 0, int(time.time()))
+            )
+
+    async def add_scrobbles(self, user, scrobbles):
+        # scrobbles: [(ts, artist, album, track)], duplicates are ignored
+        await self.run(self._add_scrobbles, user, scrobbles)
+
+    def _forget(self, user):
+        user = name_key(user)
+        with self.db:
+            self.db.execute("DELETE FROM scrobbles WHERE user = ?", (user,))
+            self.db.execute("DELETE FROM sync_state WHERE user = ?", (user,))
+
+    async def forget(self, user):
+        await self.run(self._forget, user)
+
+    # Aggregations, users is the list of Last.fm usernames to include
+
+    def _top(self, group, users, since, limit):
+        columns = {
+            "artist": ("artist_key", "MAX(artist)"),
+            "album": ("artist_key, album_key", "MAX(artist), MAX(album)"),
+            "track": ("artist_key, track_key", "MAX(artist), MAX(track)"),
+        }[group]
+        where = "user IN (SELECT value FROM json_each(?))"
+        params = [json.dumps([name_key(user) for user in users])]
+        if group == "album":
+            where += " AND album_key != ''"
+        if since:
+            where += " AND ts >= ?"
+            params.append(int(since))
+        params.append(limit)
+        return self.db.execute(
+            f"SELECT {columns[1]}, COUNT(*) AS plays, COUNT(DISTINCT user) AS listeners "
+            f"FROM scrobbles WHERE {where} GROUP BY {columns[0]} "
+            f"ORDER BY plays DESC LIMIT ?",
+            params
+        ).fetchall()
+
+    async def top(self, group, users, since=None, limit=10):
+        # [(artist, [album | track,] plays, listeners)] for group "artist", "album" or "track"
+        return await self.run(self._top, group, users, since, limit)
+
+    def _who_knows(self, artist, users, limit):
+        return self.db.execute(
+            "SELECT user, COUNT(*) AS plays FROM scrobbles "
+            "WHERE artist_key = ? AND user IN (SELECT value FROM json_each(?)) "
+            "GROUP BY user ORDER BY plays DESC LIMIT ?",
+            (name_key(artist), json.dumps([name_key(user) for user in users]), limit)
+        ).fetchall()
+
+    async def who_knows(self, artist, users, limit=15):
+        # [(lastfm_username, plays)] highest first; usernames come back normalized
+        return await self.run(self._who_knows, artist, users, limit)
+
+    def _artist_name(self, artist):
+        row = self.db.execute(
+            "SELECT artist FROM scrobbles WHERE artist_key = ? LIMIT 1", (name_key(artist),)
+        ).fetchone()
+        return row[0] if row else None
+
+    async def artist_name(self, artist):
+        # Stored spelling of an artist, None if nobody scrobbled it
+        return await self.run(self._artist_name, artist)
+
+    def _stats(self):
+        scrobbles = self.db.execute("SELECT COUNT(*) FROM scrobbles").fetchone()[0]
+        users = self.db.execute("SELECT COUNT(*) FROM sync_state").fetchone()[0]
+        return scrobbles, users
+
+    async def stats(self):
+        # (stored scrobbles, synced users)
+        return await self.run(self._stats)
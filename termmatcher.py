@@ -0,0 +1,138 @@
+class TermMatcher:
+    """Aho-Corasick automaton over a list of patterns.
+
+    search() scans the text once and returns the index of the earliest
+    registered pattern that occurs in it, so callers keep "first term wins"
+    semantics while paying only for the length of the text. search_all()
+    returns every matching pattern index in registration order.
+    """
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        # Lowest pattern index ending at each node, following fail links
+        self.best = [None]
+        # Every pattern index ending at each node, following fail links
+        self.outputs = [()]
+        self.size = 0
+
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            self.add(pattern, index)
+        self.build()
+
+    def add(self, pattern, index):
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.best.append(None)
+                self.outputs.append(())
+            node = next_node
+        if self.best[node] is None or index < self.best[node]:
+            self.best[node] = index
+        self.outputs[node] = self.outputs[node] + (index,)
+        self.size += 1
+
+    def build(self):
+        # Breadth-first so every fail target is finished before it is used
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                target = self.goto[state].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                inherited = self.best[self.fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited < self.best[child]):
+                    self.best[child] = inherited
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def search(self, text):
+        if not self.size:
+            return None
+
+        goto = self.goto
+        fail = self.fail
+        best_per_node = self.best
+        node = 0
+        best = None
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = best_per_node[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+    def search_all(self, text):
+        if not self.size:
+            return []
+
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        node = 0
+        found = set()
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return sorted(found)
+
+
+class GuildTermMatcher:
+    """Blocked terms of one guild compiled into two automatons.
+
+    Basic terms are matched against the lowercased message, advanced terms
+    against the normalized message. Terms are normalized once, at build time.
+    """
+
+    def __init__(self, guild_terms, normalize):
+        self.terms = list(guild_terms.items())
+        self.normalize = normalize
+
+        simple_patterns = []
+        advanced_patterns = []
+        for term, data in self.terms:
+            if data.get('advanced_filtering', False):
+                simple_patterns.append(None)
+                advanced_patterns.append(normalize(term))
+            else:
+                simple_patterns.append(term.lower())
+                advanced_patterns.append(None)
+
+        self.simple = TermMatcher(simple_patterns)
+        self.advanced = TermMatcher(advanced_patterns)
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def find(self, content, content_lower=None):
+        if content_lower is None:
+            content_lower = content.lower()
+
+        found = self.simple.search(content_lower)
+        if self.advanced.size:
+            advanced_found = self.advanced.search(self.normalize(content))
+            if advanced_found is not None and (found is None or advanced_found < found):
+                found = advanced_found
+
+        if found is None:
+            return None, None
+        return self.terms[found]
@@ -0,0 +1,74 @@
+import asyncio
+
+
+class TypingTestPool:
+    """Pre-rendered typing tests (word list + image) for common word counts.
+
+    take() hands out a ready test immediately when one is pooled and wakes the
+    background task to render a replacement. Word counts that aren't pooled,
+    or an empty pool, count as a miss and the caller renders on demand.
+
+    make_words(count) picks the words, render(words) returns the image bytes.
+    """
+
+    def __init__(self, make_words, render, sizes=(15, 30, 60), per_size=3):
+        self.make_words = make_words
+        self.render = render
+        self.per_size = per_size
+        self.pool = {size: [] for size in sizes}
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.errors = 0
+        self.refill_needed = asyncio.Event()
+        self.task = None
+
+    def __len__(self):
+        return sum(len(tests) for tests in self.pool.values())
+
+    def take(self, word_count):
+        tests = self.pool.get(word_count)
+        if not tests:
+            self.misses += 1
+            if tests is not None:
+                self.refill_needed.set()
+            return None
+        self.hits += 1
+        self.refill_needed.set()
+        return tests.pop(0)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def refill(self):
+        # One render at a time, so the pool never crowds out interactive renders
+        for size, tests in self.pool.items():
+            while len(tests) < self.per_size:
+                words = self.make_words(size)
+                image = await self.render(words)
+                self.renders += 1
+                tests.append((words, image))
+
+    async def refill_loop(self):
+        while True:
+            try:
+                self.refill_needed.clear()
+                await self.refill()
+                await self.refill_needed.wait()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.errors += 1
+                print(f"Error refilling typing test pool: {e}")
+                await asyncio.sleep(10)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.refill_loop())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None